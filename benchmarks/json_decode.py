@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark JSON decoding of API responses with datetime conversion.
+
+Usage: python benchmarks/json_decode.py [saved_response.json ...]
+
+Pass saved responses, like a status report from
+fs-car/bs/vsr/v1/skoda/CZ/vehicles/<VIN>/status. With no arguments a
+generated status report of similar size and structure is used. The orjson
+backend is only measured when orjson is installed.
+"""
+import sys
+import json
+import timeit
+
+from datetime import datetime
+from skodaconnect import utilities
+from skodaconnect.utilities import json_loads, obj_parser, _parse_datetimes
+
+ROUNDS = 200
+
+
+def old_obj_parser(obj):
+    """Datetime conversion as done before, strptime on every value."""
+    for key, val in obj.items():
+        try:
+            obj[key] = datetime.strptime(val, "%Y-%m-%dT%H:%M:%S%z")
+        except (TypeError, ValueError):
+            pass
+    return obj
+
+
+def generated_status_report():
+    """Build a StoredVehicleDataResponse with 10 sections of 25 fields each, timestamps per section."""
+    data = []
+    for section in range(10):
+        fields = []
+        for field in range(25):
+            fields.append({
+                'id': f'0x0{section}0{field:02d}0001',
+                'tsCarSentUtc': f'2021-03-01T12:{section:02d}:56Z',
+                'tsCarSent': '2021-03-01T13:34:56',
+                'tsCarCaptured': '2021-03-01T13:34:55',
+                'tsTssReceivedUtc': f'2021-03-01T12:{section:02d}:{field:02d}Z',
+                'milCarCaptured': 12345,
+                'milCarSent': 12345,
+                'value': str(section * 100 + field),
+                'unit': 'km',
+                'textId': f'status_{section}_{field}',
+            })
+        data.append({'id': f'0x0{section}0001FFFF', 'field': fields})
+    return json.dumps({
+        'StoredVehicleDataResponse': {
+            'vin': 'TMBJJ7NE0L0000000',
+            'vehicleData': {'data': data},
+        }
+    })
+
+
+def main(args):
+    responses = []
+    for filename in args:
+        with open(filename, encoding='utf-8') as response:
+            responses.append((filename, response.read()))
+    if not responses:
+        responses.append(('generated status report', generated_status_report()))
+
+    for name, text in responses:
+        assert json.loads(text, object_hook=old_obj_parser) == json.loads(text, object_hook=obj_parser)
+        print(f'{name} ({len(text)} bytes), {ROUNDS} rounds:')
+        candidates = [
+            ('strptime always', lambda: json.loads(text, object_hook=old_obj_parser)),
+            ('shape pre-check', lambda: json.loads(text, object_hook=obj_parser)),
+        ]
+        if utilities.orjson is not None:
+            candidates.append(('orjson', lambda: _parse_datetimes(utilities.orjson.loads(text))))
+        candidates.append(('json_loads', lambda: json_loads(text)))
+        for label, func in candidates:
+            total = min(timeit.repeat(func, number=ROUNDS, repeat=3))
+            print(f'  {label:<16} {total / ROUNDS * 1000:8.3f} ms per response')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
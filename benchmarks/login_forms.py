@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark login form extraction against BeautifulSoup.
+
+Usage: python benchmarks/login_forms.py [saved_page.html:formId ...]
+
+Pass saved copies of the identity.vwgroup.io login pages, each followed by
+the id of the form to extract (emailPasswordForm or credentialsForm). With
+no arguments a generated page of similar size and structure is used.
+Requires beautifulsoup4 and lxml: pip install skodaconnect[benchmark]
+"""
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+from skodaconnect.utilities import extract_form
+
+ROUNDS = 200
+
+
+def generated_page(form_id):
+    """Build a page resembling the login page, with the form in the middle."""
+    filler = ''.join(
+        f'<div class="row"><span class="label">Item {i}</span><a href="/link/{i}">Link</a></div>\n'
+        for i in range(300)
+    )
+    script = '<script>var config = {"a": 1, "b": [1, 2, 3]};</script>\n' * 20
+    form = (
+        f'<form id="{form_id}" method="POST" action="/signin-service/v1/client/login/identifier">\n'
+        '<input type="hidden" name="_csrf" value="1b2c3d4e-5f60-7182-9304-a5b6c7d8e9f0"/>\n'
+        '<input type="hidden" name="relayState" value="0123456789abcdef0123456789abcdef01234567"/>\n'
+        '<input type="hidden" name="hmac" value="fedcba9876543210fedcba9876543210fedcba9876543210"/>\n'
+        '<input type="email" name="email" value=""/>\n'
+        '<button type="submit">Next</button>\n'
+        '</form>\n'
+    )
+    return f'<!DOCTYPE html><html><head>{script}</head><body>{filler}{form}{filler}</body></html>'
+
+
+def with_bs4(html, form_id, parser):
+    soup = BeautifulSoup(html, parser)
+    form = soup.find('form', id=form_id)
+    fields = dict([(t['name'], t['value']) for t in form.find_all('input', type='hidden')])
+    return form.get('action'), fields
+
+
+def main(args):
+    pages = []
+    for arg in args:
+        filename, form_id = arg.rsplit(':', 1)
+        with open(filename, encoding='utf-8') as page:
+            pages.append((filename, page.read(), form_id))
+    if not pages:
+        pages.append(('generated', generated_page('emailPasswordForm'), 'emailPasswordForm'))
+
+    for name, html, form_id in pages:
+        assert extract_form(html, form_id) == with_bs4(html, form_id, 'html.parser')
+        print(f'{name} ({len(html)} bytes, form "{form_id}"), {ROUNDS} rounds:')
+        candidates = [
+            ('extract_form', lambda: extract_form(html, form_id)),
+            ('bs4 html.parser', lambda: with_bs4(html, form_id, 'html.parser')),
+            ('bs4 lxml', lambda: with_bs4(html, form_id, 'lxml')),
+        ]
+        for label, func in candidates:
+            total = min(timeit.repeat(func, number=ROUNDS, repeat=3))
+            print(f'  {label:<16} {total / ROUNDS * 1000:8.3f} ms per page')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -21,6 +21,11 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     provides=["skodaconnect"],
     install_requires=list(open("requirements.txt").read().strip().split("\n")),
+    extras_require={
+        'benchmark': ['beautifulsoup4', 'lxml'],
+        'orjson': ['orjson'],
+        'numpy': ['numpy'],
+    },
     #use_scm_version=True,
     use_scm_version={"local_scheme": local_scheme},
     setup_requires=[
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Analytics over trip statistics history."""
+import math
+
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .const import TRIP_SPEED_BINS
+from .utilities import trip_id
+
+NAN = float('nan')
+
+# Columns kept for every trip: trip entry key and factor converting it to
+# the unit used by the trip_last_ properties of Vehicle
+TRIP_COLUMNS = {
+    'distance': ('mileage', 1),                                     # km
+    'duration': ('traveltime', 1),                                  # min
+    'speed': ('averageSpeed', 1),                                   # km/h
+    'fuel': ('averageFuelConsumption', 0.1),                        # l/100 km
+    'electric': ('averageElectricEngineConsumption', 0.1),          # kWh/100 km
+    'recuperation': ('recuperation', 1),                            # kWh/100 km
+    'electric_total': ('totalElectricConsumption', 1),              # kWh/100 km
+}
+
+
+def _number(value, factor=1):
+    """Return value times factor as float, NaN if it is not a number."""
+    if value.__class__ is int or value.__class__ is float:
+        return value * factor
+    return NAN
+
+
+class TripColumns:
+    """Trip statistics entries stored as columns of floats, one value per trip.
+
+    Columns are arrays of doubles, so years of trips take little memory, and
+    the analytics run as vectorised passes with numpy when it is installed,
+    as single loops over the arrays otherwise. Missing values are NaN and
+    left out of sums and averages. Consumption averages are weighted by trip
+    distance. Trips are kept in the order they are added, the order the API
+    sends them, rolling averages run over that order.
+    """
+    __slots__ = ('_columns', 'last_trip_id')
+
+    def __init__(self):
+        self._columns = dict((name, array('d')) for name in ('time',) + tuple(TRIP_COLUMNS))
+        self.last_trip_id = None
+
+    def __len__(self):
+        return len(self._columns['time'])
+
+    def __repr__(self):
+        return f'TripColumns({len(self)} trips)'
+
+    def append(self, trip):
+        """Add a trip statistics entry."""
+        timestamp = trip.get('timestamp', None)
+        self._columns['time'].append(timestamp.timestamp() if isinstance(timestamp, datetime) else NAN)
+        for name, (key, factor) in TRIP_COLUMNS.items():
+            self._columns[name].append(_number(trip.get(key, None), factor))
+        tripid = trip_id(trip)
+        if tripid is not None and (self.last_trip_id is None or tripid > self.last_trip_id):
+            self.last_trip_id = tripid
+
+    def extend(self, trips):
+        """Add trip statistics entries, returns the number added."""
+        count = len(self)
+        for trip in trips:
+            self.append(trip)
+        return len(self) - count
+
+    async def extend_stream(self, trips):
+        """Add trip statistics entries from an async iterator, returns the number added."""
+        count = len(self)
+        async for trip in trips:
+            self.append(trip)
+        return len(self) - count
+
+    def column(self, name):
+        """Return column name, a numpy array when numpy is installed, an array of doubles otherwise."""
+        if numpy is not None:
+            return numpy.frombuffer(self._columns[name], dtype=numpy.float64)
+        return self._columns[name]
+
+    def total(self, name):
+        """Return sum of column name, NaN values left out."""
+        if numpy is not None:
+            return float(numpy.nansum(self.column(name)))
+        return math.fsum(value for value in self._columns[name] if value == value)
+
+    def weighted_average(self, name, weight='distance'):
+        """Return average of column name weighted by column weight, None without data."""
+        if numpy is not None:
+            values, weights = self.column(name), self.column(weight)
+            mask = ~(numpy.isnan(values) | numpy.isnan(weights))
+            total = weights[mask].sum()
+            return float((values[mask] * weights[mask]).sum() / total) if total > 0 else None
+        weighted = total = 0.0
+        for value, factor in zip(self._columns[name], self._columns[weight]):
+            if value == value and factor == factor:
+                weighted += value * factor
+                total += factor
+        return weighted / total if total > 0 else None
+
+    def rolling_average(self, name, window=10, weight='distance'):
+        """Return the average of column name over each trip and the window - 1 trips before it.
+
+        Averages are weighted by column weight, NaN where the window has no data.
+        """
+        if numpy is not None:
+            values, weights = self.column(name), self.column(weight)
+            mask = ~(numpy.isnan(values) | numpy.isnan(weights))
+            weighted = numpy.concatenate(([0.0], numpy.cumsum(numpy.where(mask, values * weights, 0.0))))
+            totals = numpy.concatenate(([0.0], numpy.cumsum(numpy.where(mask, weights, 0.0))))
+            end = numpy.arange(1, len(values) + 1)
+            start = numpy.maximum(end - window, 0)
+            total = totals[end] - totals[start]
+            with numpy.errstate(invalid='ignore', divide='ignore'):
+                return numpy.where(total > 0, (weighted[end] - weighted[start]) / total, numpy.nan)
+        weighted = [0.0]
+        totals = [0.0]
+        for value, factor in zip(self._columns[name], self._columns[weight]):
+            valid = value == value and factor == factor
+            weighted.append(weighted[-1] + (value * factor if valid else 0.0))
+            totals.append(totals[-1] + (factor if valid else 0.0))
+        result = array('d')
+        for end in range(1, len(weighted)):
+            start = max(end - window, 0)
+            total = totals[end] - totals[start]
+            result.append((weighted[end] - weighted[start]) / total if total > 0 else NAN)
+        return result
+
+    def distance_per_day(self):
+        """Return dict of date, in UTC, to distance driven that day."""
+        if numpy is not None:
+            times, distances = self.column('time'), self.column('distance')
+            mask = ~(numpy.isnan(times) | numpy.isnan(distances))
+            days, index = numpy.unique(numpy.floor_divide(times[mask], 86400).astype(numpy.int64), return_inverse=True)
+            sums = numpy.bincount(index, weights=distances[mask], minlength=len(days))
+            return dict(
+                (datetime.fromtimestamp(int(day) * 86400, timezone.utc).date(), float(distance))
+                for day, distance in zip(days, sums)
+            )
+        result = {}
+        for time, distance in zip(self._columns['time'], self._columns['distance']):
+            if time == time and distance == distance:
+                day = datetime.fromtimestamp(time // 86400 * 86400, timezone.utc).date()
+                result[day] = result.get(day, 0.0) + distance
+        return result
+
+    def speed_distribution(self, bins=TRIP_SPEED_BINS):
+        """Return number of trips per average speed range.
+
+        Bins are the lower bounds of the ranges, the last range has no upper
+        bound. Trips slower than the first bin are not counted.
+        """
+        if numpy is not None:
+            speeds = self.column('speed')
+            index = numpy.searchsorted(numpy.asarray(bins, dtype=numpy.float64), speeds[~numpy.isnan(speeds)], side='right') - 1
+            return [int(count) for count in numpy.bincount(index[index >= 0], minlength=len(bins))]
+        counts = [0] * len(bins)
+        for speed in self._columns['speed']:
+            if speed == speed:
+                index = bisect_right(bins, speed) - 1
+                if index >= 0:
+                    counts[index] += 1
+        return counts
+
+    def recuperation_share(self):
+        """Return recuperated energy as a share of the electric energy used, None without data."""
+        recuperation = self.weighted_average('recuperation')
+        consumption = self.weighted_average('electric_total')
+        if recuperation is None or not consumption:
+            return None
+        return recuperation / consumption
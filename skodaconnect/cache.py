@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cache of responses from slowly changing API endpoints."""
+import os
+import json
+import time
+import logging
+import asyncio
+import hashlib
+
+from collections import OrderedDict
+from os import environ as env
+from os.path import join, expanduser
+
+from .utilities import json_loads, json_default
+from .const import CACHE_MAXSIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Base class for response caches.
+
+    A response cache keeps parsed responses for a number of seconds, so a
+    restart or a new discovery of vehicles does not have to fetch data that
+    rarely changes. Subclass it and override get, set and invalidate to cache
+    responses elsewhere.
+    """
+    async def get(self, key):
+        """Return cached value for key, None if missing or expired."""
+        return None
+
+    async def set(self, key, value, ttl):
+        """Cache value for key during ttl seconds."""
+        pass
+
+    async def invalidate(self, prefix=''):
+        """Remove all values with a key starting with prefix."""
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """Keep responses in memory, dropping the least recently used above `maxsize` entries."""
+    def __init__(self, maxsize=CACHE_MAXSIZE):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def _get(self, key):
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set(self, key, value, expires):
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _invalidate(self, prefix):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._entries.pop(key, None)
+
+    async def get(self, key):
+        """Return cached value for key, None if missing or expired."""
+        return self._get(key)
+
+    async def set(self, key, value, ttl):
+        """Cache value for key during ttl seconds."""
+        self._set(key, value, time.time() + ttl)
+
+    async def invalidate(self, prefix=''):
+        """Remove all values with a key starting with prefix."""
+        self._invalidate(prefix)
+
+
+class DiskCache(MemoryCache):
+    """Keep responses in memory and in files, so they survive a restart.
+
+    One file is written per key in `path`, by default
+    $XDG_CACHE_HOME/skodaconnect. Entries missing from memory are read
+    back from disk until they expire.
+    """
+    def __init__(self, path=None, maxsize=CACHE_MAXSIZE):
+        super().__init__(maxsize)
+        self._path = path or join(env.get("XDG_CACHE_HOME", join(expanduser("~"), ".cache")), "skodaconnect")
+
+    def _filename(self, key):
+        return join(self._path, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read(self, key):
+        try:
+            with open(self._filename(key)) as cachefile:
+                entry = json_loads(cachefile.read())
+            if entry['key'] != key or time.time() >= entry['expires']:
+                return None
+            return entry['expires'], entry['data']
+        except (IOError, OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def _write(self, key, value, expires):
+        os.makedirs(self._path, mode=0o700, exist_ok=True)
+        filename = self._filename(key)
+        tmpfile = filename + '.tmp'
+        fd = os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cachefile:
+            json.dump({'key': key, 'expires': expires, 'data': value}, cachefile, default=json_default)
+        os.replace(tmpfile, filename)
+
+    def _remove(self, prefix):
+        try:
+            filenames = [join(self._path, name) for name in os.listdir(self._path) if name.endswith('.json')]
+        except (IOError, OSError):
+            return
+        for filename in filenames:
+            try:
+                with open(filename) as cachefile:
+                    key = json.load(cachefile).get('key', '')
+                if key.startswith(prefix):
+                    os.remove(filename)
+            except (IOError, OSError, AttributeError, ValueError):
+                pass
+
+    async def get(self, key):
+        """Return cached value for key, None if missing or expired."""
+        value = self._get(key)
+        if value is None:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(None, self._read, key)
+            if entry is not None:
+                self._set(key, entry[1], entry[0])
+                value = entry[1]
+        return value
+
+    async def set(self, key, value, ttl):
+        """Cache value for key during ttl seconds."""
+        expires = time.time() + ttl
+        self._set(key, value, expires)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, key, value, expires)
+        except (IOError, OSError, TypeError, ValueError) as error:
+            _LOGGER.debug(f'Could not write response to cache, error: {error}')
+
+    async def invalidate(self, prefix=''):
+        """Remove all values with a key starting with prefix."""
+        self._invalidate(prefix)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._remove, prefix)
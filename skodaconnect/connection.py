@@ -12,13 +12,21 @@ import jwt
 
 from sys import version_info, argv
 from datetime import timedelta, datetime
+from functools import lru_cache
 from urllib.parse import urljoin, parse_qs, urlparse
 from json import dumps as to_json
+from types import MappingProxyType
 import aiohttp
-from bs4 import BeautifulSoup
 from base64 import b64decode, b64encode
-from skodaconnect.utilities import read_config, json_loads
+from skodaconnect.utilities import read_config, json_loads, extract_form, JsonArrayParser, trip_id
 from skodaconnect.vehicle import Vehicle
+from skodaconnect.poller import RequestPoller, REQUEST_TIMEOUT
+from skodaconnect.jwks import JWKS_CACHE
+from skodaconnect.pool import create_connector, HostLimiter
+from skodaconnect.ratelimit import RateLimitScheduler
+from skodaconnect.policy import RequestPolicy, breaker_key
+from skodaconnect.cache import MemoryCache
+from skodaconnect.fields import FieldTable
 
 from aiohttp import ClientSession, ClientTimeout
 from aiohttp.hdrs import METH_GET, METH_POST
@@ -36,6 +44,10 @@ from .const import (
     XAPPNAME,
     USER_AGENT,
     APP_URI,
+    CACHE_TTL,
+    CACHE_ACCOUNT_KINDS,
+    TRIP_STATISTICS,
+    TRIP_CHUNK_SIZE,
 )
 
 version_info >= (3, 0) or exit('Python 3 required')
@@ -43,13 +55,32 @@ version_info >= (3, 0) or exit('Python 3 required')
 _LOGGER = logging.getLogger(__name__)
 
 TIMEOUT = timedelta(seconds=30)
+CLIENT_TIMEOUT = ClientTimeout(total=TIMEOUT.seconds)
+# Streamed responses take as long as the reader needs, only stalled reads time out
+STREAM_TIMEOUT = ClientTimeout(total=None, sock_connect=TIMEOUT.seconds, sock_read=TIMEOUT.seconds)
+
+
+@lru_cache(maxsize=512)
+def _url_template(auth_url, spin_url, ref):
+    """Resolve a relative API URL against its home region base, split on $vin."""
+    if 'rolesrights' in ref:
+        return tuple(urljoin(spin_url, ref).split('$vin'))
+    return tuple(urljoin(auth_url, ref).split('$vin'))
+
 
 class Connection:
     """ Connection to VW-Group Connect services """
   # Init connection class
-    def __init__(self, session, username, password, fulldebug=False, interval=timedelta(minutes=5)):
+    def __init__(self, session, username, password, fulldebug=False, interval=timedelta(minutes=5), token_store=None, connector=None, host_limiter=None, rate_limiter=None, request_policy=None, response_cache=None, history=None):
         """ Initialize """
         self._session = session
+        self._session_connector = connector
+        self._session_owner = False
+        self._host_limiter = host_limiter or HostLimiter()
+        self._rate_limiter = rate_limiter or RateLimitScheduler()
+        self._request_policy = request_policy or RequestPolicy()
+        self._response_cache = response_cache or MemoryCache()
+        self._history = history
         self._session_fulldebug = fulldebug
         self._session_headers = HEADERS_SESSION.copy()
         self._session_base = BASE_SESSION
@@ -59,14 +90,22 @@ class Connection:
 
         self._session_auth_ref_url = BASE_SESSION
         self._session_spin_ref_url = BASE_SESSION
+        self._session_region_urls = {}
+        self._session_validators = {}
         self._session_logged_in = False
         self._session_first_update = False
         self._session_auth_username = username
         self._session_auth_password = password
         self._session_tokens = {}
+        self._session_token = 'vwg'
+        self._session_token_expiry = {}
+        self._session_refresh_task = None
+        self._session_realcars_task = None
+        self._token_store = token_store
 
         self._vin = ""
         self._vehicles = []
+        self._request_poller = RequestPoller(self)
 
         _LOGGER.debug(f'Using service {self._session_base}')
 
@@ -74,36 +113,79 @@ class Connection:
         self._state = {}
 
     def _clear_cookies(self):
-        self._session._cookie_jar._cookies.clear()
+        self._session.cookie_jar.clear()
+
+    def _ensure_session(self):
+        """Create a session on the tuned connection pool if none was given."""
+        if self._session is None:
+            _LOGGER.debug('Creating new session')
+            self._session = ClientSession(
+                connector=self._session_connector or create_connector(),
+                connector_owner=self._session_connector is None,
+                headers={'Connection': 'keep-alive'}
+            )
+            self._session_owner = True
+
+    async def warmup(self, vin=None):
+        """Open connections to the API hosts that will be used next.
+
+        Without vin these are the hosts used during login and discovery, and
+        the home region hosts of vehicles already known. With vin only the
+        home region hosts of that vehicle, once getHomeRegion resolved them.
+        """
+        if vin is not None:
+            hosts = set(self._session_region_urls.get(vin, ()))
+        else:
+            hosts = {BASE_SESSION, 'https://mal-1a.prd.ece.vwg-connect.com'}
+            for urls in self._session_region_urls.values():
+                hosts.update(urls)
+        async def connect(host):
+            try:
+                async with self._host_limiter.limit(host), self._session.head(host, timeout=CLIENT_TIMEOUT, allow_redirects=False):
+                    pass
+            except Exception as error:
+                _LOGGER.debug(f'Could not open connection to {host}, error: {error}')
+        await asyncio.gather(*[connect(host) for host in hosts])
 
   # API Login
     async def doLogin(self):
         """Login method, clean login"""
         _LOGGER.debug('Initiating new login')
-        # Remove cookies and re-init headers as we are doing a new login
-        self._clear_cookies()
-        self._session_headers = HEADERS_SESSION.copy()
-        self._session_auth_headers = HEADERS_AUTH.copy()
-        if not await self._login('Legacy'):
-            _LOGGER.info('Something failed')
-            self._session_logged_in = False
-            return False
-        else:
-            _LOGGER.info('Successfully logged in')
-            self._session_tokens['identity'] = self._session_tokens['Legacy'].copy()
+        self._ensure_session()
+        if await self._restore_tokens():
+            _LOGGER.info('Successfully restored session from stored tokens')
+            self._session_headers = HEADERS_SESSION.copy()
             self._session_logged_in = True
+        else:
+            # Remove cookies and re-init headers as we are doing a new login
+            self._clear_cookies()
+            self._session_headers = HEADERS_SESSION.copy()
+            self._session_auth_headers = HEADERS_AUTH.copy()
+            if not await self._login('Legacy'):
+                _LOGGER.info('Something failed')
+                self._session_logged_in = False
+                return False
+            else:
+                _LOGGER.info('Successfully logged in')
+                self._session_tokens['identity'] = self._session_tokens['Legacy'].copy()
+                self._set_token_expiry('identity')
+                self._session_logged_in = True
 
-        # Get VW-Group API tokens
-        if not await self._getAPITokens():
-            self._session_logged_in = False
-            return False
+            # Get VW-Group API tokens
+            if not await self._getAPITokens():
+                self._session_logged_in = False
+                return False
+            await self._save_tokens()
 
-        # Get list of vehicles from account
+        # Get list of vehicles from account, connect to the other API hosts meanwhile
         _LOGGER.debug('Fetching vehicles associated with account')
-        await self.set_token('vwg')
         self._session_headers.pop('Content-Type', None)
-        loaded_vehicles = await self.get(
-            url=f'https://msg.volkswagen.de/fs-car/usermanagement/users/v1/{BRAND}/{COUNTRY}/vehicles'
+        self._session_validators = {}
+        loaded_vehicles, _ = await asyncio.gather(
+            self.get(
+                url=f'https://msg.volkswagen.de/fs-car/usermanagement/users/v1/{BRAND}/{COUNTRY}/vehicles'
+            ),
+            self.warmup()
         )
         # Add Vehicle class object for all VIN-numbers from account
         if loaded_vehicles.get('userVehicles') is not None:
@@ -118,18 +200,44 @@ class Connection:
                 return False
             else:
                 _LOGGER.info('Successfully logged in to Skoda new API')
-            self._session_headers['Authorization'] = 'Bearer ' + self._session_tokens['New'].get('access_token', '')
             loaded_vehicles = await self.get(
-                'https://api.connect.skoda-auto.cz/api/v2/garage/vehicles'
+                'https://api.connect.skoda-auto.cz/api/v2/garage/vehicles',
+                token = 'New'
             )
             for vehicle in loaded_vehicles:
                 self._vehicles.append(Vehicle(self, vehicle.get('vin', '')))
 
         # Update all vehicles data before returning
-        await self.set_token('vwg')
         await self.update()
         return True
 
+    async def _restore_tokens(self):
+        """Restore tokens from the token store, refresh them if needed."""
+        if self._token_store is None:
+            return False
+        tokens = await self._token_store.load(self._session_auth_username, self._session_auth_password)
+        if not tokens or not tokens.get('identity', {}).get('refresh_token', False) or not tokens.get('vwg', False):
+            return False
+        _LOGGER.debug('Found stored tokens, trying to use them instead of a new login')
+        self._session_tokens = tokens
+        self._session_token_expiry = {}
+        try:
+            if await self.validate_tokens:
+                return True
+        except Exception as error:
+            _LOGGER.debug(f'Could not validate stored tokens, error: {error}')
+        _LOGGER.info('Stored tokens could not be refreshed, a new login is required')
+        self._session_tokens = {}
+        self._session_token_expiry = {}
+        await self._token_store.clear(self._session_auth_username)
+        return False
+
+    async def _save_tokens(self):
+        """Save tokens to the token store, if there is one."""
+        if self._token_store is not None:
+            tokens = {type: self._session_tokens[type] for type in ['identity', 'vwg'] if type in self._session_tokens}
+            await self._token_store.save(self._session_auth_username, self._session_auth_password, tokens)
+
     async def _login(self, client='Legacy'):
         """Login function."""
         # Helper functions
@@ -153,7 +261,7 @@ class Connection:
             self._session_auth_headers = HEADERS_AUTH.copy()
             if self._session_fulldebug:
                 _LOGGER.debug(f'Requesting openid config')
-            req = await self._session.get(
+            req = await self._session_request(METH_GET,
                 url='https://identity.vwgroup.io/.well-known/openid-configuration'
             )
             if req.status != 200:
@@ -170,7 +278,7 @@ class Connection:
                 self._session_auth_headers.pop('Origin', None)
                 _LOGGER.debug(f'Request headers: "{self._session_auth_headers}"')
             try:
-                req = await self._session.get(
+                req = await self._session_request(METH_GET,
                     url=authorizationEndpoint+\
                         '?redirect_uri='+APP_URI+\
                         '&nonce='+getNonce()+\
@@ -194,7 +302,7 @@ class Connection:
                     else:
                         if self._session_fulldebug:
                             _LOGGER.debug(f'Got redirect to "{ref}"')
-                        req = await self._session.get(
+                        req = await self._session_request(METH_GET,
                             url=ref,
                             headers=self._session_auth_headers,
                             allow_redirects=False
@@ -211,10 +319,9 @@ class Connection:
                 _LOGGER.debug('Got authorization endpoint')
             try:
                 response_data = await req.text()
-                responseSoup = BeautifulSoup(response_data, 'html.parser')
-                mailform = dict([(t['name'],t['value']) for t in responseSoup.find('form', id='emailPasswordForm').find_all('input', type='hidden')])
+                action, mailform = extract_form(response_data, 'emailPasswordForm')
                 mailform['email'] = self._session_auth_username
-                pe_url = authissuer+responseSoup.find('form', id='emailPasswordForm').get('action')
+                pe_url = authissuer+action
             except Exception as e:
                 _LOGGER.error('Failed to extract user login form.')
                 raise e
@@ -223,7 +330,7 @@ class Connection:
             # https://identity.vwgroup.io/signin-service/v1/{CLIENT_ID}/login/identifier
             self._session_auth_headers['Referer'] = authorizationEndpoint
             self._session_auth_headers['Origin'] = authissuer
-            req = await self._session.post(
+            req = await self._session_request(METH_POST,
                 url = pe_url,
                 headers = self._session_auth_headers,
                 data = mailform
@@ -232,10 +339,9 @@ class Connection:
                 raise Exception('POST password request failed')
             try:
                 response_data = await req.text()
-                responseSoup = BeautifulSoup(response_data, 'html.parser')
-                pwform = dict([(t['name'],t['value']) for t in responseSoup.find('form', id='credentialsForm').find_all('input', type='hidden')])
+                action, pwform = extract_form(response_data, 'credentialsForm')
                 pwform['password'] = self._session_auth_password
-                pw_url = authissuer+responseSoup.find('form', id='credentialsForm').get('action')
+                pw_url = authissuer+action
             except Exception as e:
                 _LOGGER.error('Failed to extract password login form.')
                 raise e
@@ -247,7 +353,7 @@ class Connection:
             _LOGGER.debug('Authenticating with email and password.')
             if self._session_fulldebug:
                 _LOGGER.debug(f'Using login action url: "{pw_url}"')
-            req = await self._session.post(
+            req = await self._session_request(METH_POST,
                 url=pw_url,
                 headers=self._session_auth_headers,
                 data = pwform,
@@ -261,7 +367,7 @@ class Connection:
                 while not ref.startswith(APP_URI):
                     if self._session_fulldebug:
                         _LOGGER.debug(f'Following redirect to "{ref}"')
-                    response = await self._session.get(
+                    response = await self._session_request(METH_GET,
                         url=ref,
                         headers=self._session_auth_headers,
                         allow_redirects=False
@@ -306,7 +412,7 @@ class Connection:
             }
             _LOGGER.debug('Trying to fetch user identity tokens.')
             tokenURL = 'https://tokenrefreshservice.apps.emea.vwapps.io/exchangeAuthCode'
-            req = await self._session.post(
+            req = await self._session_request(METH_POST,
                 url=tokenURL,
                 headers=self._session_auth_headers,
                 data = tokenBody,
@@ -346,7 +452,7 @@ class Connection:
                 'scope': 'sc2:fal'
             }
             _LOGGER.debug('Trying to fetch api tokens.')
-            req = await self._session.post(
+            req = await self._session_request(METH_POST,
                 url='https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/token',
                 headers= {
                     'User-Agent': USER_AGENT,
@@ -363,6 +469,7 @@ class Connection:
             else:
                 # Save tokens as "vwg", use theese for get/posts to VW Group API
                 self._session_tokens['vwg'] = await req.json()
+                self._set_token_expiry('vwg')
                 if 'error' in self._session_tokens['vwg']:
                     error = self._session_tokens['vwg'].get('error', '')
                     if 'error_description' in self._session_tokens['vwg']:
@@ -377,9 +484,6 @@ class Connection:
                     _LOGGER.warning('VW-Group API token could not be verified!')
                 else:
                     _LOGGER.debug('VW-Group API token verified OK.')
-
-            # Update headers for requests, defaults to using VWG token
-            self._session_headers['Authorization'] = 'Bearer ' + self._session_tokens['vwg']['access_token']
         except Exception as error:
             _LOGGER.error(f'Failed to fetch VW-Group API tokens, {error}')
             self._session_logged_in = False
@@ -389,24 +493,34 @@ class Connection:
     async def terminate(self):
         """Log out from connect services"""
         _LOGGER.info(f'Initiating logout')
+        self._request_poller.cancel()
         await self.logout()
+        if self._history is not None:
+            await self._history.flush()
+        if self._session_owner:
+            await self._session.close()
+            self._session = None
+            self._session_owner = False
 
     async def logout(self):
         """Logout, revoke tokens."""
-        self._session_headers.pop('Authorization', None)
-
         if self._session_logged_in:
             if self._session_headers.get('vwg', {}).get('access_token'):
                 _LOGGER.info('Revoking API Access Token...')
-                self._session_headers['token_type_hint'] = 'access_token'
                 params = {"token": self._session_tokens['vwg']['access_token']}
-                revoke_at = await self.post('https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/revoke', data = params)
+                revoke_at = await self.post(
+                    'https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/revoke',
+                    headers = {'Authorization': None, 'token_type_hint': 'access_token'},
+                    data = params
+                )
             if self._session_headers.get('vwg', {}).get('refresh_token'):
                 _LOGGER.info('Revoking API Refresh Token...')
-                self._session_headers['token_type_hint'] = 'refresh_token'
                 params = {"token": self._session_tokens['vwg']['refresh_token']}
-                revoke_rt = await self.post('https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/revoke', data = params)
-                self._session_headers.pop('token_type_hint', None)
+                revoke_rt = await self.post(
+                    'https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/revoke',
+                    headers = {'Authorization': None, 'token_type_hint': 'refresh_token'},
+                    data = params
+                )
             if self._session_headers.get('identity', {}).get('identity_token'):
                 _LOGGER.info('Revoking Identity Access Token...')
                 #params = {
@@ -420,21 +534,78 @@ class Connection:
                     "token": self._session_tokens['identity']['refresh_token'],
                     "brand": BRAND
                 }
-                revoke_rt = await self.post('https://tokenrefreshservice.apps.emea.vwapps.io/revokeToken', data = params)
+                revoke_rt = await self.post(
+                    'https://tokenrefreshservice.apps.emea.vwapps.io/revokeToken',
+                    headers = {'Authorization': None},
+                    data = params
+                )
 
   # HTTP methods to API
-    async def _request(self, method, url, **kwargs):
+    def _request_headers(self, token=None, headers=None):
+        """Build the headers for a single request.
+
+        The shared session headers are never modified. Every request gets its
+        own read-only copy, with the Authorization header for the given token
+        type and any extra headers applied. Extra headers set to None are
+        removed from the copy.
+        """
+        request_headers = self._session_headers.copy()
+        access_token = self._session_tokens.get(token or self._session_token, {}).get('access_token', None)
+        if access_token:
+            request_headers['Authorization'] = 'Bearer ' + access_token
+        for key, value in (headers or {}).items():
+            if value is None:
+                request_headers.pop(key, None)
+            else:
+                request_headers[key] = value
+        return MappingProxyType(request_headers)
+
+    async def _session_request(self, method, url, **kwargs):
+        """Perform a plain request on the session, within the host limits.
+
+        The body is read before the host slot and the connection are
+        released, json() and text() of the returned response use it.
+        """
+        async with self._host_limiter.limit(url), self._session.request(method, url, **kwargs) as response:
+            await response.read()
+            return response
+
+    def _record_rate_limit(self, vin, url, response):
+        """Record the request budget reported by a response."""
+        if 'X-RateLimit-Remaining' in response.headers:
+            self._rate_limiter.record(vin, url, response.headers.get('X-RateLimit-Remaining', ''))
+        elif response.status == 429:
+            self._rate_limiter.record(vin, url, 0)
+
+    def _breaker_open(self, vin, url, endpoint):
+        """Return True if requests to endpoint are paused by its circuit breaker."""
+        if self._request_policy.allow(vin, endpoint):
+            return False
+        _LOGGER.debug(f'Skipping request for "{url}", it has failed too many times')
+        return True
+
+    async def _request(self, method, url, token=None, headers=None, vin='', conditional=False, **kwargs):
         """Perform a query to the VW-Group API"""
         _LOGGER.debug(f'HTTP {method} "{url}"')
-        async with self._session.request(
+        # Ask for data only if changed since the last response for the URL
+        validators = self._session_validators.get(url, None) if conditional else None
+        if validators is not None:
+            headers = dict(headers or {})
+            if validators[0]:
+                headers['If-None-Match'] = validators[0]
+            if validators[1]:
+                headers['If-Modified-Since'] = validators[1]
+        async with self._host_limiter.limit(url), self._session.request(
             method,
             url,
-            headers=self._session_headers,
-            timeout=ClientTimeout(total=TIMEOUT.seconds),
+            headers=self._request_headers(token, headers),
+            timeout=CLIENT_TIMEOUT,
             cookies=self._jarCookie,
             raise_for_status=False,
             **kwargs
         ) as response:
+            # Keep track of request budget for vehicle, before any error is raised
+            self._record_rate_limit(vin, url, response)
             response.raise_for_status()
 
             # Update cookie jar
@@ -446,6 +617,23 @@ class Connection:
             try:
                 if response.status == 204:
                     res = {'status_code': response.status}
+                elif response.status == 304:
+                    res = {'status_code': response.status, 'unchanged': True}
+                elif conditional and response.status == 200:
+                    # Compare body with last response, for servers not supporting validators
+                    body = await response.read()
+                    digest = hashlib.blake2b(body, digest_size=16).digest()
+                    if validators is not None and validators[2] == digest:
+                        res = {'status_code': response.status, 'unchanged': True}
+                    else:
+                        # Validators are kept by commit_validators once the data has been stored
+                        res = json_loads(body)
+                        res['validators'] = (
+                            url,
+                            response.headers.get('ETag', None),
+                            response.headers.get('Last-Modified', None),
+                            digest
+                        )
                 elif response.status >= 200 or response.status <= 300:
                     res = await response.json(loads=json_loads)
                 else:
@@ -464,10 +652,24 @@ class Connection:
                 _LOGGER.debug(f'Request for "{url}" returned with status code [{response.status}]')
             return res
 
-    async def get(self, url, vin=''):
-        """Perform a get query."""
+    async def get(self, url, vin='', token=None, headers=None, conditional=False, policy=True):
+        """Perform a get query, transient errors are retried according to request policy.
+
+        With conditional set, a response equal to the last one for the URL
+        returns {'status_code': N, 'unchanged': True} without being parsed.
+        A changed response carries its validators, pass them to
+        commit_validators once its data has been stored.
+        Requests made for user actions pass policy=False, they are neither
+        retried nor held back by circuit breakers.
+        """
+        url = self._make_url(url, vin)
         try:
-            response = await self._request(METH_GET, self._make_url(url, vin))
+            if not policy:
+                return await self._request(METH_GET, url, token, headers, vin, conditional=conditional)
+            endpoint = breaker_key(url, vin)
+            if self._breaker_open(vin, url, endpoint):
+                return {'status_code': self._request_policy.last_status(vin, endpoint) or 503}
+            response = await self._request_policy.call(vin, endpoint, self._request, METH_GET, url, token, headers, vin, conditional=conditional)
             return response
         except aiohttp.client_exceptions.ClientResponseError as error:
             if error.status == 401:
@@ -483,23 +685,51 @@ class Connection:
                 _LOGGER.error(f'Got unhandled error from server: {error.status}')
             return {'status_code': error.status}
 
-    async def post(self, url, vin='', **data):
+    def commit_validators(self, validators):
+        """Keep validators of a conditional response, so later equal responses are reported unchanged."""
+        url, etag, modified, digest = validators
+        self._session_validators[url] = (etag, modified, digest)
+
+    async def post(self, url, vin='', token=None, headers=None, **data):
         """Perform a post query."""
         if data:
-            return await self._request(METH_POST, self._make_url(url, vin), **data)
+            return await self._request(METH_POST, self._make_url(url, vin), token, headers, vin, **data)
         else:
-            return await self._request(METH_POST, self._make_url(url, vin))
+            return await self._request(METH_POST, self._make_url(url, vin), token, headers, vin)
+
+    async def _cached_get(self, kind, url, vin='', **kwargs):
+        """Perform a get query, for slowly changing data that is cached CACHE_TTL[kind] seconds."""
+        key = f'{self._session_auth_username}:{vin}:{kind}'
+        response = await self._response_cache.get(key)
+        if response is not None:
+            _LOGGER.debug(f'Using cached {kind} for "{vin}"')
+            return response
+        response = await self.get(url, vin, **kwargs)
+        if response and 'status_code' not in response:
+            await self._response_cache.set(key, response, CACHE_TTL[kind])
+        return response
+
+    async def invalidate_cache(self, vin=None, kind=None):
+        """Drop cached responses of the account, of one vehicle or of one kind for a vehicle.
+
+        Kinds in CACHE_ACCOUNT_KINDS are cached once for the account and list
+        all its vehicles, they are dropped together with those of any vehicle.
+        """
+        prefix = f'{self._session_auth_username}:'
+        if vin is None:
+            await self._response_cache.invalidate(prefix)
+            return
+        await self._response_cache.invalidate(f'{prefix}{vin}:{kind or ""}')
+        if kind is None or kind in CACHE_ACCOUNT_KINDS:
+            await self._response_cache.invalidate(f'{prefix}:{kind or ""}')
 
   # Construct URL from request, home region and variables
     def _make_url(self, ref, vin=''):
-        replacedUrl = re.sub('\$vin', vin, ref)
-        if ('://' in replacedUrl):
+        if ('://' in ref):
             #already server contained in URL
-            return replacedUrl
-        elif 'rolesrights' in replacedUrl:
-            return urljoin(self._session_spin_ref_url, replacedUrl)
-        else:
-            return urljoin(self._session_auth_ref_url, replacedUrl)
+            return ref.replace('$vin', vin)
+        auth_url, spin_url = self._session_region_urls.get(vin, (self._session_auth_ref_url, self._session_spin_ref_url))
+        return vin.join(_url_template(auth_url, spin_url, ref))
 
   # Update data for all Vehicles
     async def update(self):
@@ -517,12 +747,16 @@ class Connection:
                     raise Exception(f'Login for {BRAND} account failed')
 
             _LOGGER.debug('Going to call vehicle updates')
+            # Vehicles share one fetch of account data during this update
+            self._session_realcars_task = None
             # Get all Vehicle objects and update in parallell
             updatelist = []
             for vehicle in self.vehicles:
                 updatelist.append(vehicle.update())
             # Wait for all data updates to complete
             await asyncio.gather(*updatelist)
+            if self._history is not None:
+                await self._history.flush()
 
             return True
         except (IOError, OSError, LookupError, Exception) as error:
@@ -535,11 +769,13 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
-            response = await self.get('https://mal-1a.prd.ece.vwg-connect.com/api/cs/vds/v1/vehicles/$vin/homeRegion', vin)
-            self._session_auth_ref_url = response['homeRegion']['baseUri']['content'].split('/api')[0].replace('mal-', 'fal-') if response['homeRegion']['baseUri']['content'] != 'https://mal-1a.prd.ece.vwg-connect.com/api' else 'https://msg.volkswagen.de'
-            self._session_spin_ref_url = response['homeRegion']['baseUri']['content'].split('/api')[0]
-            return response['homeRegion']['baseUri']['content']
+            response = await self._cached_get('homeRegion', 'https://mal-1a.prd.ece.vwg-connect.com/api/cs/vds/v1/vehicles/$vin/homeRegion', vin)
+            baseUri = response['homeRegion']['baseUri']['content']
+            self._session_region_urls[vin] = (
+                baseUri.split('/api')[0].replace('mal-', 'fal-') if baseUri != 'https://mal-1a.prd.ece.vwg-connect.com/api' else 'https://msg.volkswagen.de',
+                baseUri.split('/api')[0]
+            )
+            return baseUri
         except Exception as error:
             _LOGGER.debug(f'Could not get homeregion, error {error}')
             self._session_logged_in = False
@@ -550,8 +786,7 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
-            response = await self.get('/api/rolesrights/operationlist/v3/vehicles/$vin', vin)
+            response = await self._cached_get('operationList', '/api/rolesrights/operationlist/v3/vehicles/$vin', vin)
             if response.get('operationList', False):
                 data = response.get('operationList', {})
             elif response.get('status_code', {}):
@@ -565,29 +800,42 @@ class Connection:
             data = {'error': 'unknown'}
         return data
 
-    async def getRealCarData(self, vin):
-        """Get car information from customer profile, VIN, nickname, etc."""
+    async def getRealCars(self):
+        """Get car information of all vehicles from customer profile, keyed by VIN."""
         if not await self.validate_tokens:
-            return False
+            return {}
         try:
             _LOGGER.debug("Attempting extraction of subject from identity token.")
             atoken = self._session_tokens['identity']['access_token']
             subject = jwt.decode(atoken, verify=False).get('sub', None)
-            await self.set_token('identity')
-            response = await self.get(
-                f'https://customer-profile.apps.emea.vwapps.io/v1/customers/{subject}/realCarData'
+            response = await self._cached_get(
+                'realCarData',
+                f'https://customer-profile.apps.emea.vwapps.io/v1/customers/{subject}/realCarData',
+                token = 'identity'
             )
             if response.get('realCars', {}):
-                data = {
-                    'carData': next(item for item in response.get('realCars', []) if item['vehicleIdentificationNumber'] == vin)
-                }
-                return data
+                return dict((item.get('vehicleIdentificationNumber', ''), item) for item in response.get('realCars', []))
             elif response.get('status_code', {}):
                 _LOGGER.warning(f'Could not fetch realCarData, HTTP status code: {response.get("status_code")}')
             else:
                 _LOGGER.info('Unhandled error while trying to fetch realcar data')
         except Exception as error:
             _LOGGER.warning(f'Could not fetch realCarData, error: {error}')
+        return {}
+
+    async def _realcars_once(self):
+        """Fetch realCarData once per update cycle, concurrent callers share the same fetch."""
+        if self._session_realcars_task is None:
+            self._session_realcars_task = asyncio.ensure_future(self.getRealCars())
+        return await asyncio.shield(self._session_realcars_task)
+
+    async def getRealCarData(self, vin):
+        """Get car information from customer profile, VIN, nickname, etc."""
+        realcars = await self._realcars_once()
+        if vin in realcars:
+            return {'carData': realcars[vin]}
+        elif realcars:
+            _LOGGER.info(f'Vehicle {vin} not found in realCarData')
         return False
 
     async def getCarportData(self, vin):
@@ -595,8 +843,8 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
-            response = await self.get(
+            response = await self._cached_get(
+                'carportData',
                 f'fs-car/promoter/portfolio/v1/{BRAND}/{COUNTRY}/vehicle/$vin/carportdata',
                 vin = vin
             )
@@ -616,15 +864,17 @@ class Connection:
     async def getVehicleStatusData(self, vin):
         """Get stored vehicle data response."""
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/vsr/v1/{BRAND}/{COUNTRY}/vehicles/$vin/status',
-                vin = vin
+                vin = vin,
+                conditional = True
             )
+            if response.get('unchanged', False):
+                return {'unchanged': True}
             if response.get('StoredVehicleDataResponse', {}).get('vehicleData', {}).get('data', {})[0].get('field', {})[0] :
                 data = {
-                    'StoredVehicleDataResponse': response.get('StoredVehicleDataResponse', {}),
-                    'StoredVehicleDataResponseParsed': dict([(e['id'],e if 'value' in e else '') for f in [s['field'] for s in response['StoredVehicleDataResponse']['vehicleData']['data']] for e in f])
+                    'StoredVehicleData': FieldTable.from_response(response.get('StoredVehicleDataResponse', {})),
+                    'validators': response.get('validators', None)
                 }
                 return data
             elif response.get('status_code', {}):
@@ -640,7 +890,6 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/tripstatistics/v1/{BRAND}/{COUNTRY}/vehicles/$vin/tripdata/shortTerm?newest',
                 vin = vin
@@ -656,12 +905,65 @@ class Connection:
             _LOGGER.warning(f'Could not fetch trip statistics, error: {error}')
         return False
 
+    async def streamTripStatistics(self, vin, kind='shortTerm', after=None):
+        """Yield trip statistics entries from the shortTerm, longTerm or cyclic history.
+
+        Entries are yielded in the order the API sends them, decoded while the
+        response is read, the history is never held in memory at once. With
+        after set to a tripID, only trips with a higher tripID are yielded, to
+        resume from the highest one seen. Entries without a numeric tripID are
+        then skipped, as they cannot be told apart from trips seen before.
+        """
+        if kind not in TRIP_STATISTICS:
+            raise ValueError(f'Unknown trip statistics "{kind}", must be one of {", ".join(TRIP_STATISTICS)}')
+        if not await self.validate_tokens:
+            return
+        url = self._make_url(f'fs-car/bs/tripstatistics/v1/{BRAND}/{COUNTRY}/vehicles/$vin/tripdata/{kind}?type=list', vin)
+        endpoint = breaker_key(url, vin)
+        if self._breaker_open(vin, url, endpoint):
+            return
+        _LOGGER.debug(f'HTTP GET "{url}", streaming')
+        parser = JsonArrayParser('tripData')
+        after = int(after) if after is not None else None
+        finished = False
+        try:
+            # Only sending the request takes a host slot, reading the body at
+            # the pace of the reader must not hold back other requests
+            async with self._host_limiter.limit(url):
+                response = await self._session.get(
+                    url,
+                    headers=self._request_headers(),
+                    timeout=STREAM_TIMEOUT,
+                    cookies=self._jarCookie,
+                    raise_for_status=False
+                )
+            try:
+                self._record_rate_limit(vin, url, response)
+                response.raise_for_status()
+                # No content when the vehicle has no trips
+                if response.status != 204:
+                    async for chunk in response.content.iter_chunked(TRIP_CHUNK_SIZE):
+                        for entry in parser.feed(chunk):
+                            if after is None or trip_id(entry) is not None and trip_id(entry) > after:
+                                yield entry
+                    parser.close()
+            finally:
+                response.release()
+            self._request_policy.record_success(vin, endpoint)
+            finished = True
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            finished = self._request_policy.record_error(vin, endpoint, error)
+            _LOGGER.warning(f'Could not fetch {kind} trip statistics, error: {error}')
+        finally:
+            # Stream closed early by the reader
+            if not finished:
+                self._request_policy.end_probe(vin, endpoint)
+
     async def getPosition(self, vin):
         """Get position data."""
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/cf/v1/{BRAND}/{COUNTRY}/vehicles/$vin/position',
                 vin = vin
@@ -693,13 +995,15 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/departuretimer/v1/{BRAND}/{COUNTRY}/vehicles/$vin/timer',
-                vin = vin
+                vin = vin,
+                conditional = True
             )
+            if response.get('unchanged', False):
+                return {'unchanged': True}
             if response.get('timer', {}):
-                data = {'timers': response.get('timer', {})}
+                data = {'timers': response.get('timer', {}), 'validators': response.get('validators', None)}
                 return data
             elif response.get('status_code', {}):
                 _LOGGER.warning(f'Could not fetch timers, HTTP status code: {response.get("status_code")}')
@@ -714,13 +1018,15 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/climatisation/v1/{BRAND}/{COUNTRY}/vehicles/$vin/climater',
-                vin = vin
+                vin = vin,
+                conditional = True
             )
+            if response.get('unchanged', False):
+                return {'unchanged': True}
             if response.get('climater', {}):
-                data = {'climater': response.get('climater', {})}
+                data = {'climater': response.get('climater', {}), 'validators': response.get('validators', None)}
                 return data
             elif response.get('status_code', {}):
                 _LOGGER.warning(f'Could not fetch climatisation, HTTP status code: {response.get("status_code")}')
@@ -735,13 +1041,15 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/batterycharge/v1/{BRAND}/{COUNTRY}/vehicles/$vin/charger',
-                vin = vin
+                vin = vin,
+                conditional = True
             )
+            if response.get('unchanged', False):
+                return {'unchanged': True}
             if response.get('charger', {}):
-                data = {'charger': response.get('charger', {})}
+                data = {'charger': response.get('charger', {}), 'validators': response.get('validators', None)}
                 return data
             elif response.get('status_code', {}):
                 _LOGGER.warning(f'Could not fetch pre-heating, HTTP status code: {response.get("status_code")}')
@@ -756,13 +1064,15 @@ class Connection:
         if not await self.validate_tokens:
             return False
         try:
-            await self.set_token('vwg')
             response = await self.get(
                 f'fs-car/bs/rs/v1/{BRAND}/{COUNTRY}/vehicles/$vin/status',
-                vin = vin
+                vin = vin,
+                conditional = True
             )
+            if response.get('unchanged', False):
+                return {'unchanged': True}
             if response.get('statusResponse', {}):
-                data = {'heating': response.get('statusResponse', {})}
+                data = {'heating': response.get('statusResponse', {}), 'validators': response.get('validators', None)}
                 return data
             elif response.get('status_code', {}):
                 _LOGGER.warning(f'Could not fetch pre-heating, HTTP status code: {response.get("status_code")}')
@@ -784,7 +1094,6 @@ class Connection:
                 if not await self.doLogin():
                     _LOGGER.warning(f'Login for {BRAND} account failed!')
                     raise Exception(f'Login for {BRAND} account failed')
-            await self.set_token('vwg')
             if sectionId == 'climatisation':
                 url = f'fs-car/bs/$sectionId/v1/{BRAND}/{COUNTRY}/vehicles/$vin/climater/actions/$requestId'
             elif sectionId == 'batterycharge':
@@ -795,10 +1104,9 @@ class Connection:
                 url = f'fs-car/bs/$sectionId/v1/{BRAND}/{COUNTRY}/vehicles/$vin/requests/$requestId/jobstatus'
             else:
                 url = f'fs-car/bs/$sectionId/v1/{BRAND}/{COUNTRY}/vehicles/$vin/requests/$requestId/status'
-            url = re.sub('\$sectionId', sectionId, url)
-            url = re.sub('\$requestId', requestId, url)
+            url = url.replace('$sectionId', sectionId).replace('$requestId', str(requestId))
 
-            response = await self.get(url, vin)
+            response = await self.get(url, vin, policy=False)
             # Pre-heater, ???
             if response.get('requestStatusResponse', {}).get('status', False):
                 result = response.get('requestStatusResponse', {}).get('status', False)
@@ -823,6 +1131,10 @@ class Connection:
             _LOGGER.warning(f'Failure during get request status: {error}')
             raise Exception(f'Failure during get request status: {error}')
 
+    async def wait_for_request(self, vin, sectionId, requestId, timeout=REQUEST_TIMEOUT):
+        """Wait for the final status of a request ID, polled together with all other outstanding requests."""
+        return await self._request_poller.wait(vin, sectionId, requestId, timeout)
+
     async def get_sec_token(self, vin, spin, action):
         """Get a security token, required for certain set functions."""
         urls = {
@@ -837,7 +1149,7 @@ class Connection:
         try:
             if not urls.get(action, False):
                 raise Exception(f'Security token for "{action}" is not implemented')
-            response = await self.get(self._make_url(urls.get(action), vin = vin))
+            response = await self.get(urls.get(action), vin = vin, policy = False)
             secToken = response['securityPinAuthInfo']['securityToken']
             challenge = response['securityPinAuthInfo']['securityPinTransmission']['challenge']
             spinHash = self.hash_spin(challenge, spin)
@@ -850,9 +1162,11 @@ class Connection:
                     'securityToken': secToken
                 }
             }
-            self._session_headers['Content-Type'] = 'application/json'
-            response = await self.post(self._make_url('/api/rolesrights/authorization/v2/security-pin-auth-completed', vin = vin), json = body)
-            self._session_headers.pop('Content-Type', None)
+            response = await self.post(
+                self._make_url('/api/rolesrights/authorization/v2/security-pin-auth-completed', vin = vin),
+                headers = {'Content-Type': 'application/json'},
+                json = body
+            )
             if response.get('securityToken', False):
                 return response['securityToken']
             else:
@@ -863,7 +1177,7 @@ class Connection:
             raise
 
  #### Data set functions ####
-    async def dataCall(self, query, vin='', **data):
+    async def dataCall(self, query, vin='', token=None, headers=None, **data):
         """Function to execute actions through VW-Group API."""
         if self.logged_in == False:
             if not await self.doLogin():
@@ -875,7 +1189,7 @@ class Connection:
                 if not await self.doLogin():
                     _LOGGER.warning(f'Login for {BRAND} account failed!')
                     raise Exception(f'Login for {BRAND} account failed')
-            response = await self.post(query, vin=vin, **data)
+            response = await self.post(query, vin=vin, token=token, headers=headers, **data)
             _LOGGER.debug(f'Data call returned: {response}')
             return response
         except aiohttp.client_exceptions.ClientResponseError as error:
@@ -901,7 +1215,6 @@ class Connection:
     async def setRefresh(self, vin):
         """"Force vehicle data update."""
         try:
-            await self.set_token('vwg')
             response = await self.dataCall(f'fs-car/bs/vsr/v1/{BRAND}/{COUNTRY}/vehicles/$vin/requests', vin, data=None)
             if not response:
                 raise Exception('Invalid or no response')
@@ -920,7 +1233,6 @@ class Connection:
     async def setCharger(self, vin, data):
         """Start/Stop charger."""
         try:
-            await self.set_token('vwg')
             response = await self.dataCall(f'fs-car/bs/batterycharge/v1/{BRAND}/{COUNTRY}/vehicles/$vin/charger/actions', vin, json = data)
             if not response:
                 raise Exception('Invalid or no response')
@@ -939,12 +1251,11 @@ class Connection:
     async def setClimater(self, vin, data, spin):
         """Execute climatisation actions."""
         try:
-            await self.set_token('vwg')
+            headers = {}
             # Only get security token if auxiliary heater is to be started
             if data.get('action', {}).get('settings', {}).get('heaterSource', None) == 'auxiliary':
-                self._session_headers['X-securityToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'rclima')
-            response = await self.dataCall(f'fs-car/bs/climatisation/v1/{BRAND}/{COUNTRY}/vehicles/$vin/climater/actions', vin, json = data)
-            self._session_headers.pop('X-securityToken', None)
+                headers['X-securityToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'rclima')
+            response = await self.dataCall(f'fs-car/bs/climatisation/v1/{BRAND}/{COUNTRY}/vehicles/$vin/climater/actions', vin, headers = headers, json = data)
             if not response:
                 raise Exception('Invalid or no response')
             elif response == 429:
@@ -956,27 +1267,16 @@ class Connection:
                 _LOGGER.debug(f'Request for climater action returned with state "{request_state}", request id: {request_id}, remaining requests: {remaining}')
                 return dict({'id': str(request_id), 'state': request_state, 'rate_limit_remaining': remaining})
         except:
-            self._session_headers.pop('X-securityToken', None)
             raise
         return False
 
     async def setPreHeater(self, vin, data, spin):
         """Petrol/diesel parking heater actions."""
         try:
-            await self.set_token('vwg')
-            if 'Content-Type' in self._session_headers:
-                contType = self._session_headers['Content-Type']
-            else:
-                contType = ''
-            self._session_headers['Content-Type'] = 'application/vnd.vwg.mbb.RemoteStandheizung_v2_0_2+json'
+            headers = {'Content-Type': 'application/vnd.vwg.mbb.RemoteStandheizung_v2_0_2+json'}
             if not 'quickstop' in data:
-                self._session_headers['x-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'heating')
-            response = await self.dataCall(f'fs-car/bs/rs/v1/{BRAND}/{COUNTRY}/vehicles/$vin/action', vin = vin, json = data)
-            # Clean up headers
-            self._session_headers.pop('x-mbbSecToken', None)
-            self._session_headers.pop('Content-Type', None)
-            if contType: self._session_headers['Content-Type'] = contType
-
+                headers['x-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'heating')
+            response = await self.dataCall(f'fs-car/bs/rs/v1/{BRAND}/{COUNTRY}/vehicles/$vin/action', vin = vin, headers = headers, json = data)
             if not response:
                 raise Exception('Invalid or no response')
             elif response == 429:
@@ -987,31 +1287,19 @@ class Connection:
                 _LOGGER.debug(f'Request for parking heater is queued with request id: {request_id}, remaining requests: {remaining}')
                 return dict({'id': str(request_id), 'state': None, 'rate_limit_remaining': remaining})
         except Exception as error:
-            self._session_headers.pop('x-mbbSecToken', None)
-            self._session_headers.pop('Content-Type', None)
-            if contType: self._session_headers['Content-Type'] = contType
             raise
         return False
 
     async def setLock(self, vin, data, spin):
         """Remote lock and unlock actions."""
         try:
-            await self.set_token('vwg')
             # Prepare data, headers and fetch security token
-            if 'Content-Type' in self._session_headers:
-                contType = self._session_headers['Content-Type']
-            else:
-                contType = ''
+            headers = {'Content-Type': 'application/vnd.vwg.mbb.RemoteLockUnlock_v1_0_0+xml'}
             if 'unlock' in data:
-                self._session_headers['X-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'unlock')
+                headers['X-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'unlock')
             else:
-                self._session_headers['X-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'lock')
-            self._session_headers['Content-Type'] = 'application/vnd.vwg.mbb.RemoteLockUnlock_v1_0_0+xml'
-            response = await self.dataCall(f'fs-car/bs/rlu/v1/{BRAND}/{COUNTRY}/vehicles/$vin/actions', vin, data = data)
-            # Clean up headers
-            self._session_headers.pop('X-mbbSecToken', None)
-            self._session_headers.pop('Content-Type', None)
-            if contType: self._session_headers['Content-Type'] = contType
+                headers['X-mbbSecToken'] = await self.get_sec_token(vin = vin, spin = spin, action = 'lock')
+            response = await self.dataCall(f'fs-car/bs/rlu/v1/{BRAND}/{COUNTRY}/vehicles/$vin/actions', vin, headers = headers, data = data)
             if not response:
                 raise Exception('Invalid or no response')
             elif response == 429:
@@ -1023,9 +1311,6 @@ class Connection:
                 _LOGGER.debug(f'Request for lock action returned with state "{request_state}", request id: {request_id}, remaining requests: {remaining}')
                 return dict({'id': str(request_id), 'state': request_state, 'rate_limit_remaining': remaining})
         except:
-            self._session_headers.pop('X-mbbSecToken', None)
-            self._session_headers.pop('Content-Type', None)
-            if contType: self._session_headers['Content-Type'] = contType
             raise
         return False
 
@@ -1033,36 +1318,47 @@ class Connection:
     @property
     async def validate_tokens(self):
         """Function to validate expiry of tokens."""
-        idtoken = self._session_tokens['identity']['id_token']
-        atoken = self._session_tokens['vwg']['access_token']
-        id_exp = jwt.decode(idtoken, verify=False).get('exp', None)
-        at_exp = jwt.decode(atoken, verify=False).get('exp', None)
-        id_dt = datetime.fromtimestamp(int(id_exp))
-        at_dt = datetime.fromtimestamp(int(at_exp))
+        id_dt = self._session_token_expiry.get('identity', None) or self._set_token_expiry('identity')
+        at_dt = self._session_token_expiry.get('vwg', None) or self._set_token_expiry('vwg')
         now = datetime.now()
         later = now + self._session_refresh_interval
 
         # Check if tokens have expired, or expires now
         if now >= id_dt or now >= at_dt:
             _LOGGER.debug('Tokens have expired. Try to fetch new tokens.')
-            if await self.refresh_tokens():
+            if await self._refresh_tokens_once():
                 _LOGGER.debug('Successfully refreshed tokens')
             else:
                 return False
         # Check if tokens expires before next update
         elif later >= id_dt or later >= at_dt:
             _LOGGER.debug('Tokens about to expire. Try to fetch new tokens.')
-            if await self.refresh_tokens():
+            if await self._refresh_tokens_once():
                 _LOGGER.debug('Successfully refreshed tokens')
             else:
                 return False
         return True
 
+    def _set_token_expiry(self, type):
+        """Decode and remember expiry time of stored tokens, returns expiry."""
+        if type == 'identity':
+            token = self._session_tokens['identity']['id_token']
+        else:
+            token = self._session_tokens[type]['access_token']
+        expiry = datetime.fromtimestamp(int(jwt.decode(token, verify=False).get('exp', None)))
+        self._session_token_expiry[type] = expiry
+        return expiry
+
+    async def _refresh_tokens_once(self):
+        """Refresh tokens, concurrent callers share the same refresh."""
+        if self._session_refresh_task is None or self._session_refresh_task.done():
+            self._session_refresh_task = asyncio.ensure_future(self.refresh_tokens())
+        return await asyncio.shield(self._session_refresh_task)
+
     async def verify_tokens(self, token, type, client='Legacy'):
         """Function to verify JWT against JWK(s)."""
         if type == 'identity':
-            req = await self._session.get(url = 'https://identity.vwgroup.io/oidc/v1/keys')
-            keys = await req.json()
+            url = 'https://identity.vwgroup.io/oidc/v1/keys'
             audience = [
                 CLIENT[client].get('CLIENT_ID'),
                 'VWGMBB01DELIV1',
@@ -1070,24 +1366,19 @@ class Connection:
                 'https://api.vas.eu.wcardp.io'
             ]
         elif type == 'vwg':
-            req = await self._session.get(url = 'https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/public/jwk/v1')
-            keys = await req.json()
+            url = 'https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/public/jwk/v1'
             audience = 'mal.prd.ece.vwg-connect.com'
         else:
             _LOGGER.debug('Not implemented')
             return False
         try:
-            pubkeys = {}
-            for jwk in keys['keys']:
-                kid = jwk['kid']
-                if jwk['kty'] == 'RSA':
-                    pubkeys[kid] = jwt.algorithms.RSAAlgorithm.from_jwk(to_json(jwk))
-
             token_kid = jwt.get_unverified_header(token)['kid']
             if type == 'vwg':
                 token_kid = 'VWGMBB01DELIV1.' + token_kid
 
-            pubkey = pubkeys[token_kid]
+            pubkey = await JWKS_CACHE.get_key(self._session, url, token_kid)
+            if pubkey is None:
+                raise Exception(f'No public key found for key id "{token_kid}"')
             payload = jwt.decode(token, key=pubkey, algorithms=['RS256'], audience=audience)
             return True
         except Exception as error:
@@ -1112,7 +1403,7 @@ class Connection:
                 'brand': BRAND,
                 'refresh_token': self._session_tokens['identity']['refresh_token']
             }
-            response = await self._session.post(
+            response = await self._session_request(METH_POST,
                 url = 'https://tokenrefreshservice.apps.emea.vwapps.io/refreshTokens',
                 headers = tHeaders,
                 data = body
@@ -1124,6 +1415,7 @@ class Connection:
                     _LOGGER.warning('Token could not be verified!')
                 for token in tokens:
                     self._session_tokens['identity'][token] = tokens[token]
+                self._set_token_expiry('identity')
             else:
                 _LOGGER.warning(f'Something went wrong when refreshing {BRAND} account tokens.')
                 return False
@@ -1134,7 +1426,7 @@ class Connection:
                 'token': self._session_tokens['identity']['id_token']
             }
 
-            response = await self._session.post(
+            response = await self._session_request(METH_POST,
                 url = 'https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth/mobile/oauth2/v1/token',
                 headers = tHeaders,
                 data = body,
@@ -1146,18 +1438,20 @@ class Connection:
                     _LOGGER.warning('Token could not be verified!')
                 for token in tokens:
                     self._session_tokens['vwg'][token] = tokens[token]
+                self._set_token_expiry('vwg')
             else:
                 resp = await response.text()
                 _LOGGER.warning('Something went wrong when refreshing API tokens. %s' % resp)
                 return False
+            await self._save_tokens()
             return True
         except Exception as error:
             _LOGGER.warning(f'Could not refresh tokens: {error}')
             return False
 
     async def set_token(self, type):
-        """Switch between tokens."""
-        self._session_headers['Authorization'] = 'Bearer ' + self._session_tokens[type]['access_token']
+        """Switch the default token for requests that do not name one."""
+        self._session_token = type
         return
 
  #### Class helpers ####
@@ -1166,6 +1460,21 @@ class Connection:
         """Return list of Vehicle objects."""
         return self._vehicles
 
+    @property
+    def rate_limiter(self):
+        """Return the scheduler keeping track of the request budget of all vehicles."""
+        return self._rate_limiter
+
+    @property
+    def history(self):
+        """Return the store recording vehicle history, None if history is not kept."""
+        return self._history
+
+    @property
+    def request_policy(self):
+        """Return the retry and circuit breaker policy for data requests."""
+        return self._request_policy
+
     @property
     def logged_in(self):
         return self._session_logged_in
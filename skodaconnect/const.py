@@ -55,3 +55,74 @@ HEADERS_AUTH = {
     'User-Agent': USER_AGENT,
     'X-App-Name': XAPPNAME
 }
+
+# Connection pool, maximum number of concurrent requests per API host.
+# Keys ending with "-" match all hosts starting with it, like the
+# mal-/fal- home region hosts.
+HOST_LIMITS = {
+    'identity.vwgroup.io': 4,
+    'tokenrefreshservice.apps.emea.vwapps.io': 4,
+    'msg.volkswagen.de': 20,
+    'mal-': 10,
+    'fal-': 20,
+}
+POOL_LIMIT = 100
+POOL_DNS_TTL = 300
+POOL_KEEPALIVE = 60
+
+# Retry of failed data requests, delays in seconds
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1
+RETRY_MAX_BACKOFF = 10
+RETRY_STATUSES = (500, 502, 503, 504)
+# Circuit breaker per vehicle and endpoint, consecutive failures before it
+# opens and seconds between probes while open, doubled after each failed probe
+BREAKER_THRESHOLD = 3
+BREAKER_PROBE_INTERVAL = 900
+BREAKER_MAX_PROBE_INTERVAL = 21600
+
+# Response cache, seconds to keep responses of slowly changing endpoints
+CACHE_TTL = {
+    'homeRegion': 604800,
+    'carportData': 604800,
+    'realCarData': 86400,
+    'operationList': 86400,
+}
+# Cached kinds fetched once for the account, covering all its vehicles
+CACHE_ACCOUNT_KINDS = ('realCarData',)
+CACHE_MAXSIZE = 1024
+
+# Fleet of accounts, maximum number of accounts logging in or updating at a time
+FLEET_CONCURRENCY = 10
+
+# Maximum age in seconds of each kind of vehicle data in Vehicle.update,
+# keyed by the name of its get_ method. All data is fetched when the status
+# report shows the car sent new data. Position is polled more often while
+# the vehicle moves and the charger while energy flows. Trip statistics are
+# also polled after the vehicle parked.
+POLL_INTERVALS = {
+    'statusreport': 0,
+    'position': 900,
+    'charger': 3600,
+    'climater': 1800,
+    'preheater': 1800,
+    'timerprogramming': 3600,
+    'trip_statistic': 21600,
+}
+POLL_INTERVAL_MOVING = 60
+POLL_INTERVAL_CHARGING = 60
+
+# Vehicle attributes recorded in the history store, when one is used
+HISTORY_ATTRIBUTES = (
+    'distance', 'fuel_level', 'battery_level', 'electric_range', 'combustion_range', 'combined_range',
+    'outside_temperature', 'position', 'parking_time', 'door_locked', 'trunk_locked', 'windows_closed',
+    'door_closed_left_front', 'door_closed_left_back', 'door_closed_right_front', 'door_closed_right_back',
+    'trunk_closed', 'hood_closed', 'charging', 'external_power',
+)
+
+# Trip statistics histories that can be streamed, and bytes read at a time
+TRIP_STATISTICS = ('shortTerm', 'longTerm', 'cyclic')
+TRIP_CHUNK_SIZE = 16384
+
+# Lower bounds of the average speed ranges of trip analytics, km/h
+TRIP_SPEED_BINS = (0, 20, 40, 60, 80, 100, 120, 140)
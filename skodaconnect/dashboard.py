@@ -3,6 +3,7 @@
 
 import logging
 from skodaconnect.utilities import camel2slug
+from skodaconnect.fields import STATUS_FIELDS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class Instrument:
         self.name = name
         self.vehicle = None
         self.icon = icon
+        self.configured = False
 
     def __repr__(self):
         return self.full_name
@@ -31,7 +33,9 @@ class Instrument:
             return False
 
         _LOGGER.debug("%s is supported", self)
-        self.configurate(**config)
+        if not self.configured:
+            self.configurate(**config)
+            self.configured = True
         return True
 
     @property
@@ -48,13 +52,18 @@ class Instrument:
 
     @property
     def str_state(self):
-        return self.state
+        return self.format_state(self.state)
+
+    def format_state(self, state):
+        """Return state as shown to users."""
+        return state
 
     @property
     def state(self):
-        if hasattr(self.vehicle, self.attr):
+        # Read the attribute once, hasattr would read it too
+        try:
             return getattr(self.vehicle, self.attr)
-        else:
+        except AttributeError:
             _LOGGER.debug(f'Could not find attribute "{self.attr}"')
         return self.vehicle.get_attr(self.attr)
 
@@ -102,12 +111,11 @@ class Sensor(Instrument):
     def is_mutable(self):
         return False
 
-    @property
-    def str_state(self):
+    def format_state(self, state):
         if self.unit:
-            return f'{self.state} {self.unit}'
+            return f'{state} {self.unit}'
         else:
-            return f'{self.state}'
+            return f'{state}'
 
     @property
     def state(self):
@@ -137,20 +145,19 @@ class BinarySensor(Instrument):
     def is_mutable(self):
         return False
 
-    @property
-    def str_state(self):
+    def format_state(self, state):
         if self.device_class in ["door", "window"]:
-            return "Open" if self.state else "Closed"
+            return "Open" if state else "Closed"
         if self.device_class == "lock":
-            return "Unlocked" if self.state else "Locked"
+            return "Unlocked" if state else "Locked"
         if self.device_class == "safety":
-            return "Warning!" if self.state else "OK"
+            return "Warning!" if state else "OK"
         if self.device_class == "plug":
-            return "Charging" if self.state else "Plug removed"
-        if self.state is None:
-            _LOGGER.error("Can not encode state %s:%s", self.attr, self.state)
+            return "Charging" if state else "Plug removed"
+        if state is None:
+            _LOGGER.error("Can not encode state %s:%s", self.attr, state)
             return "?"
-        return "On" if self.state else "Off"
+        return "On" if state else "Off"
 
     @property
     def state(self):
@@ -181,9 +188,8 @@ class Switch(Instrument):
     def is_mutable(self):
         return True
 
-    @property
-    def str_state(self):
-        return "On" if self.state else "Off"
+    def format_state(self, state):
+        return "On" if state else "Off"
 
     def is_on(self):
         return self.state
@@ -283,13 +289,11 @@ class Position(Instrument):
             state.get("timestamp", None),
         )
 
-    @property
-    def str_state(self):
-        state = super().state #or {}
-        ts = state.get("timestamp", None)
+    def format_state(self, state):
+        lat, lng, ts = state
         return (
-            state.get("lat", "?"),
-            state.get("lng", "?"),
+            lat,
+            lng,
             str(ts.astimezone(tz=None)) if ts else None,
         )
 
@@ -305,9 +309,8 @@ class DoorLock(Instrument):
     def is_mutable(self):
         return True
 
-    @property
-    def str_state(self):
-        return "Locked" if self.state else "Unlocked"
+    def format_state(self, state):
+        return "Locked" if state else "Unlocked"
 
     @property
     def state(self):
@@ -338,9 +341,8 @@ class TrunkLock(Instrument):
     def is_mutable(self):
         return True
 
-    @property
-    def str_state(self):
-        return "Locked" if self.state else "Unlocked"
+    def format_state(self, state):
+        return "Locked" if state else "Unlocked"
 
     @property
     def state(self):
@@ -587,7 +589,34 @@ class RequestResults(Sensor):
         return dict(self.vehicle.request_results)
 
 
+def field_instruments():
+    """Return instruments for the status report fields in the catalogue."""
+    instruments = []
+    for field in STATUS_FIELDS:
+        if not field.name:
+            continue
+        if field.is_bool:
+            instruments.append(BinarySensor(
+                attr=field.attr,
+                name=field.name,
+                device_class=field.device_class,
+                icon=field.icon or '',
+                reverse_state=field.reverse_state
+            ))
+        else:
+            instruments.append(Sensor(
+                attr=field.attr,
+                name=field.name,
+                icon=field.icon,
+                unit=field.unit
+            ))
+    return instruments
+
+
 def create_instruments():
+    # Catalogue fields keep their place among the other instruments, fields
+    # not placed here are added at the end
+    fields = dict((instrument.attr, instrument) for instrument in field_instruments())
     return [
         Position(),
         DoorLock(),
@@ -603,54 +632,19 @@ def create_instruments():
         #CombustionClimatisationClimate(),
         Charging(),
         RequestResults(),
-        Sensor(
-            attr="distance",
-            name="Odometer",
-            icon="mdi:speedometer",
-            unit="km",
-        ),
+        fields.pop('distance'),
         Sensor(
             attr="battery_level",
             name="Battery level",
             icon="mdi:battery",
             unit="%",
         ),
-        Sensor(
-            attr="adblue_level",
-            name="Adblue level",
-            icon="mdi:fuel",
-            unit="km",
-        ),
-        Sensor(
-            attr="fuel_level",
-            name="Fuel level",
-            icon="mdi:fuel",
-            unit="%",
-        ),
-        Sensor(
-            attr="service_inspection",
-            name="Service inspection days",
-            icon="mdi:garage",
-            unit="days",
-        ),
-        Sensor(
-            attr="service_inspection_distance",
-            name="Service inspection distance",
-            icon="mdi:garage",
-            unit="km",
-        ),
-        Sensor(
-            attr="oil_inspection",
-            name="Oil inspection days",
-            icon="mdi:oil",
-            unit="days",
-        ),
-        Sensor(
-            attr="oil_inspection_distance",
-            name="Oil inspection distance",
-            icon="mdi:oil",
-            unit="km",
-        ),
+        fields.pop('adblue_level'),
+        fields.pop('fuel_level'),
+        fields.pop('service_inspection'),
+        fields.pop('service_inspection_distance'),
+        fields.pop('oil_inspection'),
+        fields.pop('oil_inspection_distance'),
         Sensor(
             attr="last_connected",
             name="Last connected",
@@ -669,24 +663,9 @@ def create_instruments():
             icon="mdi:battery-charging-100",
             unit="h",
         ),
-        Sensor(
-            attr="electric_range",
-            name="Electric range",
-            icon="mdi:car-electric",
-            unit="km",
-        ),
-        Sensor(
-            attr="combustion_range",
-            name="Combustion range",
-            icon="mdi:car",
-            unit="km",
-        ),
-        Sensor(
-            attr="combined_range",
-            name="Combined range",
-            icon="mdi:car",
-            unit="km",
-        ),
+        fields.pop('electric_range'),
+        fields.pop('combustion_range'),
+        fields.pop('combined_range'),
         Sensor(
             attr="charge_max_ampere",
             name="Charger max ampere",
@@ -747,6 +726,42 @@ def create_instruments():
             icon="mdi:car-battery",
             unit="kWh/100 km",
         ),
+        Sensor(
+            attr="trip_total_distance",
+            name="Trips total distance",
+            icon="mdi:map-marker-distance",
+            unit="km",
+        ),
+        Sensor(
+            attr="trip_total_duration",
+            name="Trips total duration",
+            icon="mdi:clock",
+            unit="min",
+        ),
+        Sensor(
+            attr="trip_average_speed",
+            name="Trips average speed",
+            icon="mdi:speedometer",
+            unit="km/h",
+        ),
+        Sensor(
+            attr="trip_average_fuel_consumption",
+            name="Trips average fuel consumption",
+            icon="mdi:fuel",
+            unit="l/100 km",
+        ),
+        Sensor(
+            attr="trip_average_electric_consumption",
+            name="Trips average electric consumption",
+            icon="mdi:car-battery",
+            unit="kWh/100 km",
+        ),
+        Sensor(
+            attr="trip_recuperation_share",
+            name="Trips recuperation share",
+            icon="mdi:battery-plus",
+            unit="%",
+        ),
         Sensor(
             attr="pheater_status",
             name="Parking Heater heating/ventilation status",
@@ -759,12 +774,7 @@ def create_instruments():
             icon="mdi:timer",
             unit="minutes",
         ),
-        Sensor(
-            attr="outside_temperature",
-            name="Outside temperature",
-            icon="mdi:thermometer",
-            unit="°C",
-        ),
+        fields.pop('outside_temperature'),
         Sensor(
             attr="requests_remaining",
             name="Requests remaining",
@@ -781,64 +791,20 @@ def create_instruments():
             name="Energy flow",
             device_class="power"
         ),
-        BinarySensor(
-            attr="parking_light",
-            name="Parking light",
-            device_class="light",
-            icon="mdi:car-parking-lights"
-        ),
+        fields.pop('parking_light'),
         BinarySensor(
             attr="door_locked",
             name="Doors locked",
             device_class="lock",
             reverse_state=True
         ),
-        BinarySensor(
-            attr="door_closed_left_front",
-            name="Door closed left front",
-            device_class="door",
-            reverse_state=True,
-            icon="mdi:car-door"
-        ),
-        BinarySensor(
-            attr="door_closed_right_front",
-            name="Door closed right front",
-            device_class="door",
-            reverse_state=True,
-            icon="mdi:car-door"
-        ),
-        BinarySensor(
-            attr="door_closed_left_back",
-            name="Door closed left back",
-            device_class="door",
-            reverse_state=True,
-            icon="mdi:car-door"
-        ),
-        BinarySensor(
-            attr="door_closed_right_back",
-            name="Door closed right back",
-            device_class="door",
-            reverse_state=True,
-            icon="mdi:car-door"
-        ),
-        BinarySensor(
-            attr="trunk_locked",
-            name="Trunk locked",
-            device_class="lock",
-            reverse_state=True
-        ),
-        BinarySensor(
-            attr="trunk_closed",
-            name="Trunk closed",
-            device_class="door",
-            reverse_state=True
-        ),
-        BinarySensor(
-            attr="hood_closed",
-            name="Hood closed",
-            device_class="door",
-            reverse_state=True
-        ),
+        fields.pop('door_closed_left_front'),
+        fields.pop('door_closed_right_front'),
+        fields.pop('door_closed_left_back'),
+        fields.pop('door_closed_right_back'),
+        fields.pop('trunk_locked'),
+        fields.pop('trunk_closed'),
+        fields.pop('hood_closed'),
         BinarySensor(
             attr="charging_cable_connected",
             name="Charging cable connected",
@@ -851,42 +817,17 @@ def create_instruments():
             device_class="lock",
             reverse_state=True
         ),
-        BinarySensor(
-            attr="sunroof_closed",
-            name="Sunroof closed",
-            device_class="window",
-            reverse_state=True
-        ),
+        fields.pop('sunroof_closed'),
         BinarySensor(
             attr="windows_closed",
             name="Windows closed",
             device_class="window",
             reverse_state=True
         ),
-        BinarySensor(
-            attr="window_closed_left_front",
-            name="Window closed left front",
-            device_class="window",
-            reverse_state=True
-        ),
-        BinarySensor(
-            attr="window_closed_left_back",
-            name="Window closed left back",
-            device_class="window",
-            reverse_state=True
-        ),
-        BinarySensor(
-            attr="window_closed_right_front",
-            name="Window closed right front",
-            device_class="window",
-            reverse_state=True
-        ),
-        BinarySensor(
-            attr="window_closed_right_back",
-            name="Window closed right back",
-            device_class="window",
-            reverse_state=True
-        ),
+        fields.pop('window_closed_left_front'),
+        fields.pop('window_closed_left_back'),
+        fields.pop('window_closed_right_front'),
+        fields.pop('window_closed_right_back'),
         BinarySensor(
             attr="vehicle_moving",
             name="Vehicle Moving",
@@ -897,14 +838,56 @@ def create_instruments():
             name="Request in progress",
             device_class="connectivity"
         ),
+        *fields.values(),
     ]
 
 
 class Dashboard:
+    """Instruments supported by a vehicle.
+
+    Which instruments are supported is checked again when the vehicle data
+    has changed, see Vehicle.generation, not on every access.
+    """
     def __init__(self, vehicle, **config):
         _LOGGER.debug("Setting up dashboard with config :%s", config)
-        self.instruments = [
-            instrument
-            for instrument in create_instruments()
-            if instrument.setup(vehicle, **config)
-        ]
+        self._vehicle = vehicle
+        self._config = config
+        self._candidates = create_instruments()
+        self._generation = None
+        self._instruments = []
+
+    @property
+    def instruments(self):
+        """Return supported instruments, checking support once per data generation."""
+        generation = self._vehicle.generation
+        if generation != self._generation:
+            self._instruments = [
+                instrument
+                for instrument in self._candidates
+                if instrument.setup(self._vehicle, **self._config)
+            ]
+            self._generation = generation
+        return self._instruments
+
+    def changed_instruments(self, changed):
+        """Return instruments showing one of the changed vehicle attributes."""
+        return [instrument for instrument in self.instruments if instrument.attr in changed]
+
+    def snapshot(self):
+        """Return state and str_state of all supported instruments in one pass.
+
+        The dict is keyed by component and attribute, like "sensor.distance".
+        Each state is read once and str_state formatted from that value, so
+        both agree even if vehicle data changes meanwhile. Instruments failing
+        to read their state get (None, None).
+        """
+        snapshot = {}
+        for instrument in self.instruments:
+            try:
+                state = instrument.state
+                str_state = instrument.format_state(state)
+            except Exception as error:
+                _LOGGER.debug(f'Could not read state of {instrument}, error: {error}')
+                state = str_state = None
+            snapshot[f'{instrument.component}.{instrument.attr}'] = (state, str_state)
+        return snapshot
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Catalogue and compact representation of vehicle status report fields."""
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# When a field is supported by a vehicle
+PRESENT = 'present'
+HAS_VALUE = 'value'
+NONZERO = 'nonzero'
+
+_KEEP = object()
+
+
+class StatusField:
+    """Description of one status report field: its name, type and how to decode it.
+
+    Numbers are decoded as value * scale / divisor + offset, rounded to
+    `digits`. Fields with `equals` set are booleans, true when the value
+    equals it, or differs from it with `invert`. A value of 0 decodes to
+    `zero` when given. A missing value, or one that is not a number for
+    converted fields, decodes to `default`. The name, unit, icon and
+    device_class are used for the dashboard instrument, fields without a
+    name get none.
+    """
+    __slots__ = (
+        'id', 'attr', 'name', 'unit', 'scale', 'divisor', 'offset', 'digits', 'equals', 'invert',
+        'zero', 'default', 'supported', 'icon', 'device_class', 'reverse_state'
+    )
+
+    def __init__(self, id, attr, name=None, unit='', scale=1, divisor=1, offset=0, digits=None, equals=None, invert=False,
+                 zero=_KEEP, default=None, supported=PRESENT, icon=None, device_class=None, reverse_state=False):
+        self.id = id
+        self.attr = attr
+        self.name = name
+        self.unit = unit
+        self.scale = scale
+        self.divisor = divisor
+        self.offset = offset
+        self.digits = digits
+        self.equals = equals
+        self.invert = invert
+        self.zero = zero
+        self.default = default
+        self.supported = supported
+        self.icon = icon
+        self.device_class = device_class
+        self.reverse_state = reverse_state
+        # A missing boolean field reads as a value of 0
+        if equals is not None:
+            self.default = self.decode(None)
+
+    def __repr__(self):
+        return f'StatusField({self.id}, {self.attr})'
+
+    @property
+    def is_bool(self):
+        return self.equals is not None
+
+    def decode(self, value):
+        """Return typed value of the field from its converted value."""
+        if self.equals is not None:
+            return ((value if value is not None else 0) == self.equals) != self.invert
+        if value is None:
+            return self.default
+        if not value and self.zero is not _KEEP:
+            return self.zero
+        if self.scale == 1 and self.divisor == 1 and self.offset == 0:
+            return value
+        if value.__class__ is not int:
+            # Not a number, can not be converted
+            return self.default
+        value = value * self.scale
+        if self.divisor != 1:
+            value = value / self.divisor
+        value = value + self.offset
+        return round(value, self.digits) if self.digits is not None else value
+
+    def is_supported(self, value):
+        """Return true if a vehicle sending value supports the field."""
+        if self.supported == HAS_VALUE:
+            return value is not None
+        if self.supported == NONZERO:
+            return value is not None and value != 0
+        return True
+
+
+STATUS_FIELDS = (
+    # Lights
+    StatusField('0x0301010001', 'parking_light', 'Parking light', equals=2, invert=True,
+                icon='mdi:car-parking-lights', device_class='light'),
+    # Service information
+    StatusField('0x0101010002', 'distance', 'Odometer', 'km', zero=None, icon='mdi:speedometer'),
+    StatusField('0x0203010004', 'service_inspection', 'Service inspection days', 'days', scale=-1, icon='mdi:garage'),
+    StatusField('0x0203010003', 'service_inspection_distance', 'Service inspection distance', 'km', scale=-1, default=0, icon='mdi:garage'),
+    StatusField('0x0203010002', 'oil_inspection', 'Oil inspection days', 'days', scale=-1, default=0, supported=HAS_VALUE, icon='mdi:oil'),
+    StatusField('0x0203010001', 'oil_inspection_distance', 'Oil inspection distance', 'km', scale=-1, default=0, supported=HAS_VALUE, icon='mdi:oil'),
+    StatusField('0x02040C0001', 'adblue_level', 'Adblue level', 'km', default=0, supported=HAS_VALUE, icon='mdi:fuel'),
+    # Fuel level and range
+    StatusField('0x0301030008', 'electric_range', 'Electric range', 'km', default=-1, supported=HAS_VALUE, icon='mdi:car-electric'),
+    StatusField('0x0301030006', 'combustion_range', 'Combustion range', 'km', default=-1, icon='mdi:car'),
+    StatusField('0x0301030005', 'combined_range', 'Combined range', 'km', default=-1, icon='mdi:car'),
+    StatusField('0x030103000A', 'fuel_level', 'Fuel level', '%', default=-1, icon='mdi:fuel'),
+    # Temperature, sent in 1/10 Kelvin
+    StatusField('0x0301020001', 'outside_temperature', 'Outside temperature', '°C', divisor=10, offset=-273.15, digits=1,
+                zero=False, default=False, supported=HAS_VALUE, icon='mdi:thermometer'),
+    # Windows, 3 means closed
+    StatusField('0x0301050001', 'window_closed_left_front', 'Window closed left front', equals=3,
+                device_class='window', reverse_state=True),
+    StatusField('0x0301050003', 'window_closed_left_back', 'Window closed left back', equals=3,
+                device_class='window', reverse_state=True),
+    StatusField('0x0301050005', 'window_closed_right_front', 'Window closed right front', equals=3,
+                device_class='window', reverse_state=True),
+    StatusField('0x0301050007', 'window_closed_right_back', 'Window closed right back', equals=3,
+                device_class='window', reverse_state=True),
+    StatusField('0x030105000B', 'sunroof_closed', 'Sunroof closed', equals=3, supported=NONZERO,
+                device_class='window', reverse_state=True),
+    # Locks, 2 means locked
+    StatusField('0x0301040001', 'door_locked_left_front', equals=2),
+    StatusField('0x0301040004', 'door_locked_left_back', equals=2),
+    StatusField('0x0301040007', 'door_locked_right_front', equals=2),
+    StatusField('0x030104000A', 'door_locked_right_back', equals=2),
+    StatusField('0x030104000D', 'trunk_locked', 'Trunk locked', equals=2, device_class='lock', reverse_state=True),
+    # Doors, hood and trunk, 3 means closed
+    StatusField('0x0301040002', 'door_closed_left_front', 'Door closed left front', equals=3,
+                icon='mdi:car-door', device_class='door', reverse_state=True),
+    StatusField('0x0301040005', 'door_closed_left_back', 'Door closed left back', equals=3,
+                icon='mdi:car-door', device_class='door', reverse_state=True),
+    StatusField('0x0301040008', 'door_closed_right_front', 'Door closed right front', equals=3,
+                icon='mdi:car-door', device_class='door', reverse_state=True),
+    StatusField('0x030104000B', 'door_closed_right_back', 'Door closed right back', equals=3,
+                icon='mdi:car-door', device_class='door', reverse_state=True),
+    StatusField('0x030104000E', 'trunk_closed', 'Trunk closed', equals=3, device_class='door', reverse_state=True),
+    StatusField('0x0301040011', 'hood_closed', 'Hood closed', equals=3, supported=NONZERO,
+                device_class='door', reverse_state=True),
+)
+
+FIELDS_BY_ID = dict((field.id, field) for field in STATUS_FIELDS)
+
+
+def _convert(value):
+    """Return value as int when it is a number, unchanged otherwise."""
+    if value.__class__ is str:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return value
+
+
+class FieldTable:
+    """Fields of a StoredVehicleDataResponse, indexed by field ID.
+
+    The response is parsed once, keeping only the converted value and unit
+    of every field and the time the car last sent data. Field values are
+    ints when the API sent a number, None for fields without value. Fields
+    in the catalogue are decoded in the same pass, by attribute name.
+    """
+    __slots__ = ('_values', '_units', '_decoded', '_supported', 'last_connected')
+
+    def __init__(self, values=None, units=None, last_connected=None, decoded=None, supported=None):
+        self._values = values if values is not None else {}
+        self._units = units if units is not None else {}
+        self._decoded = decoded if decoded is not None else {}
+        self._supported = supported if supported is not None else frozenset()
+        self.last_connected = last_connected
+
+    @classmethod
+    def from_response(cls, response, catalogue=FIELDS_BY_ID):
+        """Build a table from a StoredVehicleDataResponse."""
+        values = {}
+        units = {}
+        decoded = {}
+        supported = set()
+        last_connected = None
+        for section in response.get('vehicleData', {}).get('data', []):
+            for field in section.get('field', []):
+                field_id = field.get('id', None)
+                if field_id is None:
+                    continue
+                value = field.get('value', None)
+                if value is not None:
+                    value = _convert(value)
+                values[field_id] = value
+                if 'unit' in field:
+                    units[field_id] = field['unit']
+                if last_connected is None:
+                    last_connected = field.get('tsCarSentUtc', None)
+                known = catalogue.get(field_id, None)
+                if known is not None:
+                    decoded[known.attr] = known.decode(value)
+                    if known.is_supported(value):
+                        supported.add(known.attr)
+        return cls(values, units, last_connected, decoded, frozenset(supported))
+
+    def __contains__(self, field_id):
+        return field_id in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __bool__(self):
+        return bool(self._values)
+
+    def __eq__(self, other):
+        if not isinstance(other, FieldTable):
+            return NotImplemented
+        return (self._values, self._units, self.last_connected) == (other._values, other._units, other.last_connected)
+
+    def __repr__(self):
+        return f'FieldTable({len(self._values)} fields)'
+
+    def get(self, field_id, default=None):
+        """Return value of field, default if it is missing or has no value."""
+        value = self._values.get(field_id, None)
+        return default if value is None else value
+
+    def value(self, attr, default=None):
+        """Return decoded value of catalogue field attr, default if it is missing."""
+        return self._decoded.get(attr, default)
+
+    def supports(self, attr):
+        """Return true if catalogue field attr is supported."""
+        return attr in self._supported
+
+    def changed(self, other):
+        """Return catalogue attributes, and last_connected, that differ from another table."""
+        attrs = set(
+            attr for attr in self._decoded.keys() | other._decoded.keys()
+            if self._decoded.get(attr, None) != other._decoded.get(attr, None)
+        )
+        attrs.update(self._supported ^ other._supported)
+        if self.last_connected != other.last_connected:
+            attrs.add('last_connected')
+        return attrs
+
+    def unit(self, field_id):
+        """Return unit of field, None if unknown."""
+        return self._units.get(field_id, None)
+
+    def as_dict(self):
+        """Return fields as a dict, for serialization."""
+        return {
+            'lastConnected': self.last_connected,
+            'fields': dict(
+                (field_id, {'value': value, 'unit': self._units[field_id]} if field_id in self._units else {'value': value})
+                for field_id, value in self._values.items()
+            )
+        }
+
+
+EMPTY_FIELDS = FieldTable()
+
+
+def decode_batch(responses, fields=STATUS_FIELDS):
+    """Decode StoredVehicleDataResponses of many vehicles into columns.
+
+    Returns a dict of attribute name to a list with the decoded value for
+    every response, None where a vehicle does not send the field.
+    """
+    tables = [FieldTable.from_response(response) for response in responses]
+    return dict(
+        (field.attr, [table.value(field.attr) if field.attr in table._decoded else None for table in tables])
+        for field in fields
+    )
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Manage many Skoda Connect accounts from one process."""
+import logging
+import asyncio
+
+from .connection import Connection
+from .pool import create_connector, HostLimiter
+from .ratelimit import RateLimitScheduler
+from .const import FLEET_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Fleet:
+    """Connections for a number of accounts sharing one connection pool.
+
+    Every account gets its own session, and with it its own cookie jar, on a
+    connector shared by all of them. Host limits and the rate limit
+    scheduler are shared too. Logins and updates run for all accounts at
+    once, at most `concurrency` of them at a time, and return a dict of
+    results keyed by username. Other keyword arguments, like interval or
+    token_store, are passed on to every Connection.
+    """
+    def __init__(self, concurrency=FLEET_CONCURRENCY, connector=None, **options):
+        self._concurrency = concurrency
+        self._connector = connector
+        self._connector_owner = connector is None
+        self._host_limiter = options.pop('host_limiter', None) or HostLimiter()
+        self._rate_limiter = options.pop('rate_limiter', None) or RateLimitScheduler()
+        self._options = options
+        self._connections = {}
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.terminate()
+
+    def add(self, username, password, **options):
+        """Add an account, returns its Connection."""
+        if username in self._connections:
+            return self._connections[username]
+        if self._connector is None:
+            self._connector = create_connector()
+        kwargs = dict(self._options, **options)
+        connection = Connection(
+            None,
+            username,
+            password,
+            connector=self._connector,
+            host_limiter=self._host_limiter,
+            rate_limiter=self._rate_limiter,
+            **kwargs
+        )
+        self._connections[username] = connection
+        return connection
+
+    async def remove(self, username):
+        """Log out and remove an account."""
+        connection = self._connections.pop(username, None)
+        if connection is not None:
+            await connection.terminate()
+
+    @property
+    def connections(self):
+        """Return dict of Connection objects keyed by username."""
+        return self._connections
+
+    @property
+    def vehicles(self):
+        """Return list of Vehicle objects of all accounts."""
+        return [vehicle for connection in self._connections.values() for vehicle in connection.vehicles]
+
+    async def _run(self, username, call):
+        """Await call for one account within the concurrency limit, False on errors."""
+        async with self._semaphore:
+            try:
+                return await call()
+            except Exception as error:
+                _LOGGER.warning(f'Account {username} failed, error: {error}')
+                return False
+
+    async def _gather(self, method):
+        """Call method on the connections of all accounts, returns results keyed by username."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        usernames = list(self._connections.keys())
+        results = await asyncio.gather(*[
+            self._run(username, getattr(self._connections[username], method))
+            for username in usernames
+        ])
+        return dict(zip(usernames, results))
+
+    async def _all(self, action, method):
+        """Call method for all accounts and log a summary of the results."""
+        results = await self._gather(method)
+        failed = [username for username, result in results.items() if not result]
+        _LOGGER.info(f'{action} of {len(results) - len(failed)}/{len(results)} accounts succeeded')
+        if failed:
+            _LOGGER.debug(f'{action} failed for accounts: {", ".join(failed)}')
+        return results
+
+    async def login(self):
+        """Log in to all accounts."""
+        return await self._all('Login', 'doLogin')
+
+    async def update(self):
+        """Update vehicles of all accounts."""
+        return await self._all('Update', 'update')
+
+    async def terminate(self):
+        """Log out from all accounts and close the connection pool."""
+        await self._gather('terminate')
+        self._connections.clear()
+        if self._connector_owner and self._connector is not None:
+            await self._connector.close()
+            self._connector = None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""History of vehicle attribute values."""
+import json
+import sqlite3
+import logging
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from os import environ as env, makedirs
+from os.path import join, expanduser, dirname
+
+from .utilities import json_loads, json_default
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    """Base class for history stores.
+
+    Vehicles record the new values of attributes every time an update
+    changed them. Values are kept in memory until flush, which the
+    connection calls after each update. Subclass it and override flush and
+    query to keep history elsewhere.
+    """
+    def __init__(self):
+        self._pending = []
+
+    def record(self, vin, timestamp, values):
+        """Add values, a dict keyed by attribute, seen at timestamp."""
+        for attr, value in values.items():
+            self._pending.append((vin, attr, timestamp, value))
+
+    async def flush(self):
+        """Write recorded values."""
+        self._pending = []
+
+    async def query(self, vin, attr, since=None, until=None):
+        """Return list of (timestamp, value) of attr, oldest first."""
+        return []
+
+    async def close(self):
+        """Write recorded values and release resources."""
+        await self.flush()
+
+
+def _encode(value):
+    """Return kind and value to store for an attribute value."""
+    if isinstance(value, bool):
+        return 'bool', int(value)
+    if isinstance(value, (int, float, str)):
+        return None, value
+    return 'json', json.dumps(value, default=json_default)
+
+
+def _decode(kind, value):
+    """Return attribute value from stored kind and value."""
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'json':
+        return json_loads(value)
+    return value
+
+
+def _timestamp(time):
+    """Return seconds since epoch of a datetime, naive datetimes are local time."""
+    return time.timestamp() if time is not None else None
+
+
+class SQLiteHistory(HistoryStore):
+    """Keep history in an SQLite database, by default $XDG_DATA_HOME/skodaconnect/history.db.
+
+    Rows of all vehicles recorded during an update are written in one
+    transaction. Queries use an index on vehicle, attribute and time. All
+    database work runs on one worker thread, off the event loop.
+    """
+    def __init__(self, path=None):
+        super().__init__()
+        self._path = path or join(env.get("XDG_DATA_HOME", join(expanduser("~"), ".local", "share")), "skodaconnect", "history.db")
+        self._db = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='skodaconnect-history')
+
+    def _open(self):
+        if self._db is None:
+            if self._path != ':memory:':
+                makedirs(dirname(self._path) or '.', mode=0o700, exist_ok=True)
+            self._db = sqlite3.connect(self._path)
+            with self._db:
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS history ('
+                    'vin TEXT NOT NULL, attr TEXT NOT NULL, ts REAL NOT NULL, kind TEXT, value)'
+                )
+                self._db.execute('CREATE INDEX IF NOT EXISTS history_vin_attr_ts ON history (vin, attr, ts)')
+        return self._db
+
+    def _write(self, rows):
+        db = self._open()
+        with db:
+            db.executemany('INSERT INTO history (vin, attr, ts, kind, value) VALUES (?, ?, ?, ?, ?)', rows)
+
+    def _read(self, vin, attr, since, until):
+        query = 'SELECT ts, kind, value FROM history WHERE vin = ? AND attr = ?'
+        args = [vin, attr]
+        if since is not None:
+            query += ' AND ts >= ?'
+            args.append(since)
+        if until is not None:
+            query += ' AND ts < ?'
+            args.append(until)
+        return self._open().execute(query + ' ORDER BY ts', args).fetchall()
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def flush(self):
+        """Write recorded values in one transaction, values recorded after close are dropped."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._closed:
+            _LOGGER.debug(f'History is closed, dropped {len(pending)} history rows')
+            return
+        rows = [(vin, attr, _timestamp(timestamp)) + _encode(value) for vin, attr, timestamp, value in pending]
+        try:
+            await self._run(self._write, rows)
+        except (sqlite3.Error, OSError) as error:
+            _LOGGER.warning(f'Could not write {len(rows)} history rows, error: {error}')
+
+    async def query(self, vin, attr, since=None, until=None):
+        """Return list of (timestamp, value) of attr from since until until, oldest first, empty after close."""
+        if self._closed:
+            return []
+        await self.flush()
+        rows = await self._run(self._read, vin, attr, _timestamp(since), _timestamp(until))
+        return [(datetime.fromtimestamp(ts, timezone.utc), _decode(kind, value)) for ts, kind, value in rows]
+
+    async def close(self):
+        """Write recorded values, close the database and stop the worker thread."""
+        if self._closed:
+            return
+        await self.flush()
+        self._closed = True
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Process wide cache of JSON Web Keys used to verify tokens."""
+import re
+import time
+import logging
+import asyncio
+import jwt
+
+from json import dumps as to_json
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lifetime of a key set when the server does not send max-age, in seconds
+JWKS_TTL = 3600
+# Minimum time between two fetches of the same key set, in seconds
+JWKS_MIN_REFETCH = 60
+
+MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class JWKSCache:
+    """Cache of RSA public keys keyed by JWKS URL and kid.
+
+    A key set is downloaded once and kept until it expires, according to the
+    max-age of its Cache-Control header or `ttl` seconds. A kid missing from a
+    cached key set triggers a single refetch, to pick up rotated keys, but
+    never more often than every `min_refetch` seconds.
+    """
+    def __init__(self, ttl=JWKS_TTL, min_refetch=JWKS_MIN_REFETCH):
+        self._ttl = ttl
+        self._min_refetch = min_refetch
+        self._keys = {}
+        self._expires = {}
+        self._fetched = {}
+        self._locks = {}
+
+    async def get_key(self, session, url, kid):
+        """Return the public key for kid from the key set at url, None if unknown."""
+        now = time.monotonic()
+        keys = self._keys.get(url, None)
+        if keys is None or now >= self._expires.get(url, 0):
+            await self._refresh(session, url)
+        elif kid not in keys and now - self._fetched.get(url, 0) >= self._min_refetch:
+            _LOGGER.debug(f'Unknown key id "{kid}", fetching key set again')
+            await self._refresh(session, url)
+        return self._keys.get(url, {}).get(kid, None)
+
+    def invalidate(self, url=None):
+        """Forget cached key sets, all of them if url is not given."""
+        if url is None:
+            self._keys.clear()
+            self._expires.clear()
+            self._fetched.clear()
+        else:
+            self._keys.pop(url, None)
+            self._expires.pop(url, None)
+            self._fetched.pop(url, None)
+
+    async def _refresh(self, session, url):
+        """Download the key set at url, once for all concurrent callers."""
+        fetched = self._fetched.get(url, 0)
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            # Someone else fetched the keys while we were waiting
+            if self._fetched.get(url, 0) != fetched:
+                return
+            try:
+                _LOGGER.debug(f'Fetching JSON Web Keys from {url}')
+                async with session.get(url = url) as req:
+                    keys = await req.json()
+                    max_age = MAX_AGE.search(req.headers.get('Cache-Control', ''))
+                pubkeys = {}
+                for jwk in keys['keys']:
+                    if jwk['kty'] == 'RSA':
+                        pubkeys[jwk['kid']] = jwt.algorithms.RSAAlgorithm.from_jwk(to_json(jwk))
+                ttl = max(int(max_age.group(1)), self._min_refetch) if max_age else self._ttl
+                self._keys[url] = pubkeys
+                self._expires[url] = time.monotonic() + ttl
+            except Exception as error:
+                # Keep using the keys we have, if any, and retry later
+                _LOGGER.debug(f'Failed to fetch JSON Web Keys from {url}, error: {error}')
+                self._keys.setdefault(url, {})
+                self._expires[url] = time.monotonic() + self._min_refetch
+            finally:
+                self._fetched[url] = time.monotonic()
+
+
+JWKS_CACHE = JWKSCache()
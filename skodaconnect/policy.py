@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Retry and circuit breaker policy for API requests."""
+import re
+import time
+import random
+import logging
+import asyncio
+
+from urllib.parse import urlsplit
+from aiohttp.client_exceptions import ClientResponseError, ClientConnectionError
+
+from .const import (
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_MAX_BACKOFF,
+    RETRY_STATUSES,
+    BREAKER_THRESHOLD,
+    BREAKER_PROBE_INTERVAL,
+    BREAKER_MAX_PROBE_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Errors not caused by the endpoint itself, handled by login and rate limiting
+IGNORED_STATUSES = (401, 429)
+
+# Path segments holding request or action IDs
+_ID_SEGMENT = re.compile(r'/(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,})(?=/|$)')
+
+
+def breaker_key(url, vin=''):
+    """Return the endpoint of a URL for circuit breakers: its path without VIN and request IDs.
+
+    >>> breaker_key('https://msg.volkswagen.de/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/VIN/climater?x=1', 'VIN')
+    '/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/$vin/climater'
+    >>> breaker_key('https://msg.volkswagen.de/fs-car/bs/vsr/v1/skoda/CZ/vehicles/VIN/requests/12345/jobstatus', 'VIN')
+    '/fs-car/bs/vsr/v1/skoda/CZ/vehicles/$vin/requests/$id/jobstatus'
+    """
+    path = urlsplit(url).path
+    if vin:
+        path = path.replace(vin, '$vin')
+    return _ID_SEGMENT.sub('/$id', path)
+
+
+class _Breaker:
+    """Circuit breaker state for one (vin, endpoint)."""
+    __slots__ = ('failures', 'status', 'opened', 'interval', 'probing')
+
+    def __init__(self):
+        self.failures = 0
+        self.status = None
+        self.opened = None
+        self.interval = 0
+        self.probing = False
+
+
+class RequestPolicy:
+    """Retry transient errors and stop calling endpoints that keep failing.
+
+    Requests failing with a status in `statuses`, a connection error or a
+    timeout are retried up to `attempts` times in total, with jittered
+    exponential backoff. Every (vin, endpoint) has a circuit breaker that
+    opens after `threshold` consecutive failed requests. While open, calls
+    are rejected and a single probe is let through every `probe_interval`
+    seconds, doubled after each failed probe up to `max_probe_interval`.
+    A successful request closes the breaker again.
+    """
+    def __init__(self, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF, max_backoff=RETRY_MAX_BACKOFF,
+                 statuses=RETRY_STATUSES, threshold=BREAKER_THRESHOLD,
+                 probe_interval=BREAKER_PROBE_INTERVAL, max_probe_interval=BREAKER_MAX_PROBE_INTERVAL):
+        self._attempts = max(attempts, 1)
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._statuses = tuple(statuses)
+        self._threshold = threshold
+        self._probe_interval = probe_interval
+        self._max_probe_interval = max_probe_interval
+        self._breakers = {}
+
+    def state(self, vin, endpoint):
+        """Return the breaker state of endpoint for vehicle."""
+        breaker = self._breakers.get((vin, endpoint), None)
+        if breaker is None or breaker.opened is None:
+            return CLOSED
+        if breaker.probing or time.monotonic() - breaker.opened >= breaker.interval:
+            return HALF_OPEN
+        return OPEN
+
+    def last_status(self, vin, endpoint):
+        """Return HTTP status of the last failed request to endpoint, None if unknown."""
+        breaker = self._breakers.get((vin, endpoint), None)
+        return breaker.status if breaker is not None else None
+
+    def allow(self, vin, endpoint):
+        """Return True if a request to endpoint may be made now."""
+        breaker = self._breakers.get((vin, endpoint), None)
+        if breaker is None or breaker.opened is None:
+            return True
+        if breaker.probing or time.monotonic() - breaker.opened < breaker.interval:
+            return False
+        _LOGGER.debug(f'Probing {endpoint} for {vin} after {breaker.failures} failed requests')
+        breaker.probing = True
+        return True
+
+    def record_success(self, vin, endpoint):
+        """Close the breaker of endpoint."""
+        breaker = self._breakers.pop((vin, endpoint), None)
+        if breaker is not None and breaker.opened is not None:
+            _LOGGER.info(f'Requests to {endpoint} for {vin} are working again')
+
+    def record_failure(self, vin, endpoint, status=None):
+        """Count a failed request to endpoint, opens the breaker at threshold."""
+        breaker = self._breakers.setdefault((vin, endpoint), _Breaker())
+        breaker.failures += 1
+        breaker.status = status
+        if breaker.probing:
+            breaker.probing = False
+            breaker.opened = time.monotonic()
+            breaker.interval = min(breaker.interval * 2, self._max_probe_interval)
+            _LOGGER.debug(f'Probe of {endpoint} for {vin} failed, next probe in {breaker.interval} seconds')
+        elif breaker.opened is None and breaker.failures >= self._threshold:
+            breaker.opened = time.monotonic()
+            breaker.interval = self._probe_interval
+            _LOGGER.warning(f'Requests to {endpoint} for {vin} failed {breaker.failures} times in a row, pausing them for {breaker.interval} seconds')
+
+    def reset(self, vin=None):
+        """Close all breakers, of one vehicle or all of them."""
+        if vin is None:
+            self._breakers.clear()
+        else:
+            for key in [key for key in self._breakers if key[0] == vin]:
+                self._breakers.pop(key, None)
+
+    def record_error(self, vin, endpoint, error):
+        """Count a failed request unless its error is ignored, return True if it was counted."""
+        status = getattr(error, 'status', None)
+        if status in IGNORED_STATUSES:
+            self.end_probe(vin, endpoint)
+            return False
+        self.record_failure(vin, endpoint, status)
+        return True
+
+    def end_probe(self, vin, endpoint):
+        """Let another probe through, the last one did not tell if endpoint works."""
+        breaker = self._breakers.get((vin, endpoint), None)
+        if breaker is not None:
+            breaker.probing = False
+
+    def _retryable(self, error):
+        if isinstance(error, ClientResponseError):
+            return error.status in self._statuses
+        return isinstance(error, (ClientConnectionError, asyncio.TimeoutError))
+
+    def _delay(self, attempt):
+        """Return jittered delay before retry number attempt."""
+        delay = min(self._backoff * 2 ** attempt, self._max_backoff)
+        return random.uniform(delay / 2, delay)
+
+    async def call(self, vin, endpoint, func, *args, **kwargs):
+        """Await func(*args, **kwargs), retrying transient errors and keeping track of failures."""
+        # A probe of an open breaker is a single request
+        breaker = self._breakers.get((vin, endpoint), None)
+        attempts = 1 if breaker is not None and breaker.probing else self._attempts
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as error:
+                    attempt += 1
+                    if not self._retryable(error) or attempt >= attempts:
+                        raise
+                    delay = self._delay(attempt - 1)
+                    _LOGGER.debug(f'Request to {endpoint} failed ({error}), retry {attempt} in {delay:.1f} seconds')
+                    await asyncio.sleep(delay)
+                    continue
+                self.record_success(vin, endpoint)
+                return result
+        except asyncio.CancelledError:
+            self.end_probe(vin, endpoint)
+            raise
+        except Exception as error:
+            self.record_error(vin, endpoint, error)
+            raise
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Shared poller for outstanding action requests."""
+import logging
+import asyncio
+
+_LOGGER = logging.getLogger(__name__)
+
+# Polling of outstanding action requests, in seconds
+REQUEST_TIMEOUT = 180
+REQUEST_DELAY = 2
+REQUEST_MAX_DELAY = 15
+# Requests due within this window are polled in the same round
+ROUND_WINDOW = 1
+
+
+class _PendingRequest:
+    """Book keeping for one outstanding (vin, sectionId, requestId)."""
+    __slots__ = ('key', 'waiters', 'deadline', 'next_poll', 'delay')
+
+    def __init__(self, key, deadline, next_poll, delay):
+        self.key = key
+        self.waiters = []
+        self.deadline = deadline
+        self.next_poll = next_poll
+        self.delay = delay
+
+
+class RequestPoller:
+    """Poll the status of all outstanding action requests of a connection.
+
+    Every in-flight request is polled from a single task in rounds, each
+    request backing off exponentially until it reaches a terminal state or
+    its deadline passes. Callers get an asyncio Future resolving to the
+    final status, as returned by Connection.get_request_status, or
+    "Timeout".
+    """
+    def __init__(self, connection, delay=REQUEST_DELAY, max_delay=REQUEST_MAX_DELAY):
+        self._connection = connection
+        self._delay = delay
+        self._max_delay = max_delay
+        self._pending = {}
+        self._task = None
+        self._wakeup = None
+
+    def track(self, vin, sectionId, requestId, timeout=REQUEST_TIMEOUT):
+        """Start tracking a request, return a Future for its final status."""
+        loop = asyncio.get_running_loop()
+        key = (vin, sectionId, str(requestId))
+        now = loop.time()
+        entry = self._pending.get(key, None)
+        if entry is None:
+            entry = _PendingRequest(key, now + timeout, now + self._delay, self._delay)
+            self._pending[key] = entry
+        else:
+            entry.deadline = max(entry.deadline, now + timeout)
+        future = loop.create_future()
+        entry.waiters.append(future)
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return future
+
+    async def wait(self, vin, sectionId, requestId, timeout=REQUEST_TIMEOUT):
+        """Wait for the final status of a request."""
+        return await self.track(vin, sectionId, requestId, timeout)
+
+    @property
+    def pending(self):
+        """Return the keys of all requests still being polled."""
+        return list(self._pending.keys())
+
+    def cancel(self):
+        """Stop polling and cancel all waiters."""
+        for entry in self._pending.values():
+            for future in entry.waiters:
+                future.cancel()
+        self._pending.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _resolve(self, entry, status=None, error=None):
+        """Resolve all waiters of a request and stop polling it."""
+        self._pending.pop(entry.key, None)
+        for future in entry.waiters:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(status)
+
+    async def _poll(self, entry):
+        """Poll one request, returns the status."""
+        vin, sectionId, requestId = entry.key
+        return await self._connection.get_request_status(vin, sectionId, requestId)
+
+    async def _run(self):
+        """Poll all outstanding requests until none is left."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            # Forget requests whose callers have all stopped waiting
+            for entry in list(self._pending.values()):
+                entry.waiters = [future for future in entry.waiters if not future.done()]
+                if not entry.waiters:
+                    self._pending.pop(entry.key, None)
+            if not self._pending:
+                break
+
+            now = loop.time()
+            due = [entry for entry in self._pending.values() if entry.next_poll <= now + ROUND_WINDOW]
+            if due:
+                _LOGGER.debug(f'Polling status of {len(due)} outstanding request(s)')
+                results = await asyncio.gather(
+                    *[self._poll(entry) for entry in due],
+                    return_exceptions=True
+                )
+                now = loop.time()
+                for entry, status in zip(due, results):
+                    if isinstance(status, Exception):
+                        self._resolve(entry, error=status)
+                    elif status != 'In progress':
+                        _LOGGER.debug(f'Request ID {entry.key[2]}: {status}')
+                        self._resolve(entry, status=status)
+                    elif now >= entry.deadline:
+                        _LOGGER.info(f'Timeout while waiting for result of {entry.key[2]}.')
+                        self._resolve(entry, status='Timeout')
+                    else:
+                        entry.next_poll = min(now + entry.delay, entry.deadline)
+                        entry.delay = min(entry.delay * 2, self._max_delay)
+                continue
+
+            # Sleep until the next request is due or a new one is tracked
+            self._wakeup.clear()
+            sleep = min(entry.next_poll for entry in self._pending.values()) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep)
+            except asyncio.TimeoutError:
+                pass
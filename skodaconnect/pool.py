@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""HTTP connection pool shared by Skoda Connect connections."""
+import logging
+import asyncio
+
+from contextlib import asynccontextmanager
+from aiohttp import TCPConnector
+
+from .const import (
+    HOST_LIMITS,
+    POOL_LIMIT,
+    POOL_DNS_TTL,
+    POOL_KEEPALIVE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_connector(limit=POOL_LIMIT, dns_ttl=POOL_DNS_TTL, keepalive=POOL_KEEPALIVE, **kwargs):
+    """Return a TCPConnector tuned for the VW-Group API.
+
+    The connector caches DNS lookups and keeps idle connections open, so
+    bursts of requests reuse sockets instead of doing a new TLS handshake.
+    It can be shared between several Connection objects.
+    """
+    return TCPConnector(
+        limit=limit,
+        ttl_dns_cache=dns_ttl,
+        use_dns_cache=True,
+        keepalive_timeout=keepalive,
+        enable_cleanup_closed=True,
+        **kwargs
+    )
+
+
+class HostLimiter:
+    """Limit the number of concurrent requests per API host.
+
+    Limits are given per host name, a name ending with "-" applies to all
+    hosts starting with it. Share one limiter between connections using
+    the same pool to make the limits apply to all of them.
+    """
+    def __init__(self, limits=HOST_LIMITS):
+        self._limits = dict(limits)
+        self._semaphores = {}
+        self._keys = {}
+
+    def _semaphore(self, url):
+        """Return the semaphore for the host of url, None if it is not limited."""
+        host = url.split('/')[2] if '://' in url else ''
+        key = self._keys.get(host, False)
+        if key is False:
+            key = None
+            for pattern in self._limits:
+                if host == pattern or (pattern.endswith('-') and host.startswith(pattern)):
+                    key = pattern
+                    break
+            self._keys[host] = key
+        if key is None:
+            return None
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self._limits[key])
+        return self._semaphores[key]
+
+    @asynccontextmanager
+    async def limit(self, url):
+        """Wait for a free slot for the host of url."""
+        semaphore = self._semaphore(url)
+        if semaphore is None:
+            yield
+        else:
+            async with semaphore:
+                yield
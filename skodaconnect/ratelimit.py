@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rate limit aware scheduling of API requests."""
+import re
+import time
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# Request priorities, user actions are never held back
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+
+# Requests left that are kept for user actions
+RATE_LIMIT_RESERVE = 2
+# Below this many requests left, background polls are spaced out
+RATE_LIMIT_SPREAD = 6
+# Seconds between background polls, per request below RATE_LIMIT_SPREAD
+RATE_LIMIT_SPACING = 300
+# Seconds after which a drained budget is assumed to be restored
+RATE_LIMIT_RESET = 3600
+
+
+def endpoint_of(url):
+    """Return the endpoint name for an API URL.
+
+    This is the service section for fs-car/bs URLs, the service path up to
+    the version for api URLs, or the resource after the version if the
+    version comes first.
+
+    >>> endpoint_of('https://msg.volkswagen.de/fs-car/bs/vsr/v1/skoda/CZ/vehicles/VIN/status')
+    'vsr'
+    >>> endpoint_of('https://mal-1a.prd.ece.vwg-connect.com/api/cs/vds/v1/vehicles/VIN/homeRegion')
+    'cs/vds'
+    >>> endpoint_of('https://mal-3a.prd.ece.vwg-connect.com/api/rolesrights/operationlist/v3/vehicles/VIN')
+    'rolesrights/operationlist'
+    >>> endpoint_of('https://mal-3a.prd.ece.vwg-connect.com/api/rolesrights/authorization/v2/security-pin-auth-requested')
+    'rolesrights/authorization'
+    >>> endpoint_of('https://api.connect.skoda-auto.cz/api/v2/garage/vehicles')
+    'garage'
+    """
+    parts = url.split('/')
+    if 'bs' in parts[:5]:
+        return parts[parts.index('bs') + 1]
+    if parts[3:4] == ['api']:
+        service = []
+        for part in parts[4:]:
+            if re.fullmatch(r'v\d+', part):
+                break
+            service.append(part)
+        return '/'.join(service or parts[5:6])
+    return parts[3] if len(parts) > 3 else ''
+
+
+class RateLimitScheduler:
+    """Track the request budget per vehicle and endpoint, and hold back background polls.
+
+    The budget is taken from the X-RateLimit-Remaining header of every
+    response. As it drains below `spread`, background polls of that
+    endpoint are spaced out further and further apart. The last `reserve`
+    requests are never spent on background polls, they are kept for user
+    actions until the budget is reported again or `reset` seconds passed.
+    """
+    def __init__(self, reserve=RATE_LIMIT_RESERVE, spread=RATE_LIMIT_SPREAD, spacing=RATE_LIMIT_SPACING, reset=RATE_LIMIT_RESET):
+        self._reserve = reserve
+        self._spread = spread
+        self._spacing = spacing
+        self._reset = reset
+        self._remaining = {}
+        self._last_call = {}
+
+    def record(self, vin, url, remaining):
+        """Record the remaining budget reported for a request."""
+        try:
+            remaining = int(remaining)
+        except (TypeError, ValueError):
+            return
+        endpoint = endpoint_of(url)
+        _LOGGER.debug(f'Requests remaining for {vin} {endpoint}: {remaining}')
+        self._remaining[(vin, endpoint)] = (remaining, time.monotonic())
+
+    def remaining(self, vin, endpoint):
+        """Return last known remaining budget for endpoint, None if unknown."""
+        remaining, updated = self._remaining.get((vin, endpoint), (None, 0))
+        if remaining is not None and time.monotonic() - updated >= self._reset:
+            return None
+        return remaining
+
+    def allow(self, vin, endpoint, priority=PRIORITY_BACKGROUND):
+        """Return True if a request to endpoint may be made now."""
+        now = time.monotonic()
+        remaining = self.remaining(vin, endpoint)
+        if priority == PRIORITY_USER or remaining is None or remaining >= self._spread:
+            self._last_call[(vin, endpoint)] = now
+            return True
+        if remaining <= self._reserve:
+            _LOGGER.debug(f'Holding back {endpoint} poll for {vin}, {remaining} request(s) left are reserved')
+            return False
+        spacing = self._spacing * (self._spread - remaining)
+        if now - self._last_call.get((vin, endpoint), 0) < spacing:
+            _LOGGER.debug(f'Deferring {endpoint} poll for {vin}, {remaining} request(s) left')
+            return False
+        self._last_call[(vin, endpoint)] = now
+        return True
+
+    def reset(self, vin, endpoint=None):
+        """Forget the budget of a vehicle, for one or all endpoints."""
+        for key in list(self._remaining.keys()):
+            if key[0] == vin and (endpoint is None or key[1] == endpoint):
+                self._remaining.pop(key, None)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Persistent storage of session tokens for Skoda Connect."""
+import os
+import json
+import logging
+import asyncio
+import hashlib
+
+from os import environ as env
+from os.path import join, expanduser
+from base64 import urlsafe_b64encode, b64encode, b64decode
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+_LOGGER = logging.getLogger(__name__)
+
+KDF_ITERATIONS = 100000
+
+
+class TokenStore:
+    """Base class for token stores.
+
+    A token store keeps the session tokens of an account between restarts,
+    so a Connection can refresh them instead of doing a full login.
+    Subclass it and override load, save and clear to store tokens elsewhere.
+    """
+    async def load(self, username, password):
+        """Return stored tokens for account, None if there are none."""
+        return None
+
+    async def save(self, username, password, tokens):
+        """Store tokens for account."""
+        pass
+
+    async def clear(self, username):
+        """Remove stored tokens for account."""
+        pass
+
+
+class FileTokenStore(TokenStore):
+    """Store tokens in files, encrypted with a key derived from the account credentials.
+
+    One file is written per account in `path`, by default
+    $XDG_CONFIG_HOME/skodaconnect. Tokens can only be read back with the
+    same username and password they were saved with.
+    """
+    def __init__(self, path=None):
+        self._path = path or join(env.get("XDG_CONFIG_HOME", join(expanduser("~"), ".config")), "skodaconnect")
+
+    def _filename(self, username):
+        return join(self._path, hashlib.sha256(username.lower().encode()).hexdigest() + '.tokens')
+
+    @staticmethod
+    def _fernet(username, password, salt):
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+        return Fernet(urlsafe_b64encode(kdf.derive(f'{username.lower()}:{password}'.encode())))
+
+    def _read(self, username, password):
+        try:
+            with open(self._filename(username)) as tokenfile:
+                content = json.load(tokenfile)
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            salt = b64decode(content['salt'])
+            data = self._fernet(username, password, salt).decrypt(content['data'].encode())
+            return json.loads(data)
+        except (InvalidToken, KeyError, TypeError, ValueError):
+            _LOGGER.debug('Could not decrypt stored tokens, ignoring them')
+            return None
+
+    def _write(self, username, password, tokens):
+        salt = os.urandom(16)
+        data = self._fernet(username, password, salt).encrypt(json.dumps(tokens).encode())
+        os.makedirs(self._path, mode=0o700, exist_ok=True)
+        filename = self._filename(username)
+        tmpfile = filename + '.tmp'
+        fd = os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as tokenfile:
+            json.dump({'salt': b64encode(salt).decode(), 'data': data.decode()}, tokenfile)
+        os.replace(tmpfile, filename)
+
+    def _remove(self, username):
+        try:
+            os.remove(self._filename(username))
+        except (IOError, OSError):
+            pass
+
+    async def load(self, username, password):
+        """Return stored tokens for account, None if there are none."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._read, username, password)
+
+    async def save(self, username, password, tokens):
+        """Store tokens for account."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, username, password, tokens)
+        except (IOError, OSError) as error:
+            _LOGGER.warning(f'Could not store tokens, error: {error}')
+
+    async def clear(self, username):
+        """Remove stored tokens for account."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._remove, username)
@@ -5,7 +5,10 @@ from sys import argv
 from os import environ as env
 from os.path import join, dirname, expanduser
 from itertools import product
+from functools import lru_cache
+from html.parser import HTMLParser
 import json
+import codecs
 import logging
 import re
 
@@ -36,20 +39,227 @@ def read_config():
     return {}
 
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+
+def _is_datetime(val):
+    """Cheap check if val looks like "2021-01-01T12:00:00Z" or "...+01:00", before parsing it."""
+    return (
+        val.__class__ is str
+        and 20 <= len(val) <= 25
+        and val[10] == "T"
+        and val[4] == "-"
+        and val[13] == ":"
+    )
+
+
 def json_loads(s):
+    """Parse JSON, converting datetime strings to datetime objects.
+
+    Uses orjson when it is installed, the json module otherwise.
+    """
+    if orjson is not None:
+        return _parse_datetimes(orjson.loads(s))
     return json.loads(s, object_hook=obj_parser)
 
 
+def json_default(obj):
+    """Serialize datetimes the way the API sends them, so json_loads parses them back.
+
+    Use it as default of json.dump and json.dumps.
+    """
+    if isinstance(obj, datetime):
+        return obj.strftime(DATETIME_FORMAT)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+@lru_cache(maxsize=1024)
+def _parse_datetime(val):
+    """Parse datetime string, None if it is not one. Responses repeat the same timestamps a lot."""
+    try:
+        return datetime.strptime(val, DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
 def obj_parser(obj):
     """Parse datetime."""
     for key, val in obj.items():
-        try:
-            obj[key] = datetime.strptime(val, "%Y-%m-%dT%H:%M:%S%z")
-        except (TypeError, ValueError):
-            pass
+        if _is_datetime(val):
+            parsed = _parse_datetime(val)
+            if parsed is not None:
+                obj[key] = parsed
+    return obj
+
+
+def _parse_datetimes(obj):
+    """Apply obj_parser to all objects of already decoded JSON."""
+    if obj.__class__ is dict:
+        for val in obj.values():
+            if val.__class__ is dict or val.__class__ is list:
+                _parse_datetimes(val)
+        obj_parser(obj)
+    elif obj.__class__ is list:
+        for val in obj:
+            if val.__class__ is dict or val.__class__ is list:
+                _parse_datetimes(val)
     return obj
 
 
+class _FormFound(Exception):
+    """Raised to stop parsing once the form has been read."""
+
+
+class FormParser(HTMLParser):
+    """Collect the action and hidden input fields of the form with a given id."""
+
+    def __init__(self, form_id):
+        super().__init__(convert_charrefs=True)
+        self.form_id = form_id
+        self.action = None
+        self.fields = {}
+        self._in_form = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "form":
+            attrs = dict(attrs)
+            if attrs.get("id") == self.form_id:
+                self._in_form = True
+                self.action = attrs.get("action", "")
+        elif tag == "input" and self._in_form:
+            attrs = dict(attrs)
+            if attrs.get("type") == "hidden" and attrs.get("name"):
+                self.fields[attrs["name"]] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._in_form:
+            raise _FormFound()
+
+
+def extract_form(html, form_id):
+    """Return action and hidden input fields of the form with id form_id.
+
+    Parsing starts at the form and stops at its end tag, the rest of the
+    page is never looked at.
+
+    >>> extract_form('<p>x</p><form id="f" action="/go"><input type="hidden" name="a" value="1"/>'
+    ...              '<input type="text" name="b"/></form><p>y</p>', 'f')
+    ('/go', {'a': '1'})
+
+    >>> extract_form('<form id="g"></form>', 'f')
+    Traceback (most recent call last):
+    ...
+    ValueError: Form "f" not found
+    """
+    start = html.find(f'id="{form_id}"')
+    if start >= 0:
+        start = max(html.rfind("<form", 0, start), 0)
+    parser = FormParser(form_id)
+    try:
+        parser.feed(html[max(start, 0):])
+        parser.close()
+    except _FormFound:
+        pass
+    if parser.action is None:
+        raise ValueError(f'Form "{form_id}" not found')
+    return parser.action, parser.fields
+
+
+class JsonArrayParser:
+    """Decode the items of the first array under a key of a JSON document fed in chunks.
+
+    Each call to feed returns the items completed by the chunk, so only one
+    item at a time is kept in memory, not the whole array. Datetimes are
+    parsed like json_loads does.
+
+    >>> parser = JsonArrayParser('tripData')
+    >>> parser.feed(b'{"tripDataList": {"tripData": [{"tripID": 1}, {"trip')
+    [{'tripID': 1}]
+    >>> parser.feed(b'ID": 2}]}}')
+    [{'tripID': 2}]
+    >>> parser.close()
+    """
+    def __init__(self, key):
+        self._marker = f'"{key}"'
+        self._buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder(object_hook=obj_parser)
+
+    def _skip(self, chars):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in chars:
+            self._pos += 1
+
+    def _start(self):
+        """Move to the first item of the array, return false if more data is needed."""
+        start = self._buffer.find(self._marker)
+        if start < 0:
+            # Keep the end, the key might be split over chunks
+            self._buffer = self._buffer[-len(self._marker):]
+            return False
+        self._pos = start + len(self._marker)
+        self._skip(' \t\r\n:')
+        if self._pos >= len(self._buffer):
+            self._buffer = self._buffer[start:]
+            return False
+        if self._buffer[self._pos] != '[':
+            raise ValueError(f'Expected an array for {self._marker}')
+        self._pos += 1
+        self._in_array = True
+        return True
+
+    def feed(self, data):
+        """Add a chunk of the document, return list of items completed by it."""
+        items = []
+        if self._done:
+            return items
+        self._buffer += self._text.decode(data)
+        if not self._in_array and not self._start():
+            return items
+        while True:
+            self._skip(' \t\r\n,')
+            if self._pos >= len(self._buffer):
+                break
+            if self._buffer[self._pos] == ']':
+                self._done = True
+                break
+            try:
+                item, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Item not complete yet
+                break
+            items.append(item)
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        return items
+
+    def close(self):
+        """Check the array, if the document had one, was read to its end."""
+        if self._in_array and not self._done:
+            raise ValueError(f'Incomplete array for {self._marker}')
+
+
+def trip_id(entry):
+    """Return the tripID of a trip statistics entry as int, None if it has no numeric one.
+
+    >>> trip_id({'tripID': '42'})
+    42
+    >>> trip_id({'tripID': 'abc'}) is None
+    True
+    """
+    try:
+        return int(entry.get('tripID', None))
+    except (TypeError, ValueError):
+        return None
+
+
 def find_path(src, path):
     """Simple navigation of a hierarchical dict structure using XPATH-like syntax.
 
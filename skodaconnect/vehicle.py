@@ -11,9 +11,56 @@ from datetime import datetime, timedelta, timezone
 from json import dumps as to_json
 from collections import OrderedDict
 from skodaconnect.utilities import find_path, is_valid_path
+from skodaconnect.poller import REQUEST_TIMEOUT
+from skodaconnect.const import POLL_INTERVALS, POLL_INTERVAL_MOVING, POLL_INTERVAL_CHARGING, HISTORY_ATTRIBUTES
+from skodaconnect.fields import FieldTable, EMPTY_FIELDS, STATUS_FIELDS
+from skodaconnect.analytics import TripColumns
 
 _LOGGER = logging.getLogger(__name__)
 
+# Vehicle attributes computed from each part of the vehicle states
+STATE_ATTRIBUTES = {
+    'carData': ('nickname', 'deactivated'),
+    'carportData': ('model', 'model_year'),
+    'charger': (
+        'battery_level', 'charge_max_ampere', 'charging', 'charging_cable_connected', 'charging_cable_locked',
+        'charging_time_left', 'energy_flow', 'external_power'
+    ),
+    'climater': (
+        'auxiliary_climatisation', 'climatisation_target_temperature', 'climatisation_without_external_power',
+        'electric_climatisation', 'window_heater'
+    ),
+    'findCarResponse': ('parking_time', 'position', 'vehicle_moving'),
+    'isMoving': ('position', 'vehicle_moving'),
+    'heating': ('pheater_heating', 'pheater_status', 'pheater_ventilation'),
+    'imageUrl': ('model_image',),
+    'rate_limit_remaining': ('requests_remaining',),
+    'timers': ('schedule1', 'schedule2', 'schedule3'),
+    'tripstatistics': (
+        'trip_last_entry', 'trip_last_average_speed', 'trip_last_average_electric_consumption',
+        'trip_last_average_fuel_consumption', 'trip_last_average_auxillary_consumption', 'trip_last_duration',
+        'trip_last_length', 'trip_last_recuperation', 'trip_last_total_electric_consumption'
+    ),
+}
+# Vehicle attributes computed from the loaded trip history
+TRIP_AGGREGATES = (
+    'trip_total_distance', 'trip_total_duration', 'trip_average_speed', 'trip_average_fuel_consumption',
+    'trip_average_electric_consumption', 'trip_recuperation_share'
+)
+# Data to poll on the next update after a request, by request section
+REQUEST_POLLS = {
+    'batterycharge': ('charger',),
+    'climatisation': ('climater',),
+    'rs': ('preheater',),
+    'rlu': ('statusreport',),
+    'vsr': tuple(POLL_INTERVALS),
+}
+# Vehicle attributes combining several status report fields
+COMBINED_FIELDS = {
+    'door_locked': ('door_locked_left_front', 'door_locked_left_back', 'door_locked_right_front', 'door_locked_right_back'),
+    'windows_closed': ('window_closed_left_front', 'window_closed_left_back', 'window_closed_right_front', 'window_closed_right_back'),
+}
+
 
 class Vehicle:
     def __init__(self, conn, url):
@@ -22,6 +69,13 @@ class Vehicle:
         self._homeregion = 'https://msg.volkswagen.de'
         self._discovered = False
         self._states = {}
+        self._generation = 0
+        self._listeners = []
+        self._polled = {}
+        self._parked = False
+        self._trips = {}
+        if conn.history is not None:
+            self.add_listener(self._record_history)
         self._requests = {
             #'departuretimer': {'status': '', 'timestamp': datetime.now()}, # Not yet implemented
             'batterycharge': {'status': '', 'timestamp': datetime.now()},
@@ -57,9 +111,11 @@ class Vehicle:
         if homeregion:
             self._homeregion = homeregion
 
+        # Connect to the home region hosts while fetching vehicle details
         await asyncio.gather(
             self.get_carportdata(),
             self.get_realcardata(),
+            self._connection.warmup(self.vin),
             return_exceptions=True
         )
         _LOGGER.info(f'Vehicle {self.vin} added. Homeregion is "{self._homeregion}"')
@@ -99,44 +155,168 @@ class Vehicle:
         _LOGGER.debug(f'API endpoints: {self._services}')
         self._discovered = True
 
-    async def update(self):
-        """Try to fetch data for all known API endpoints."""
+    async def update(self, force=False):
+        """Fetch data from the API endpoints that are due, from all of them with force.
+
+        The status report is fetched first. When the car sent new data since
+        the last one, see last_connected, all other data is fetched too.
+        Otherwise only data older than its POLL_INTERVALS maximum age is.
+        """
         if not self._discovered:
             await self.discover()
         if not self.deactivated:
+            now = time.monotonic()
+            if not force and self._poll_due('statusreport', now):
+                sent = self._fields.last_connected
+                self._polled['statusreport'] = now
+                try:
+                    await self.get_statusreport()
+                except Exception as error:
+                    _LOGGER.debug(f'Could not fetch status report, error: {error}')
+                if self._fields.last_connected != sent:
+                    _LOGGER.debug(f'Vehicle {self.vin} sent new data at {self._fields.last_connected}')
+                    for name in POLL_INTERVALS:
+                        if name != 'statusreport':
+                            self._polled.pop(name, None)
+            due = [
+                name for name in POLL_INTERVALS
+                if force or (name != 'statusreport' and self._poll_due(name, now))
+            ]
+            _LOGGER.debug(f'Vehicle {self.vin} polling {", ".join(due) or "nothing"}')
+            for name in due:
+                self._polled[name] = now
+            if 'trip_statistic' in due:
+                self._parked = False
             await asyncio.gather(
-                self.get_preheater(),
-                self.get_climater(),
-                self.get_trip_statistic(),
-                self.get_position(),
-                self.get_statusreport(),
-                self.get_charger(),
-                self.get_timerprogramming(),
+                *[getattr(self, f'get_{name}')() for name in due],
                 return_exceptions=True
             )
         else:
             _LOGGER.info(f'Vehicle with VIN {self.vin} is deactivated.')
 
+    def _poll_interval(self, name):
+        """Return seconds between polls of data fetched by get_<name> in the current vehicle state."""
+        if name == 'position' and self.vehicle_moving:
+            return POLL_INTERVAL_MOVING
+        if name == 'charger' and self.energy_flow:
+            return POLL_INTERVAL_CHARGING
+        if name == 'trip_statistic' and self._parked:
+            return 0
+        return POLL_INTERVALS.get(name, None)
+
+    def _poll_due(self, name, now):
+        """Check if data fetched by get_<name> should be polled."""
+        last = self._polled.get(name, None)
+        if last is None:
+            return True
+        interval = self._poll_interval(name)
+        return interval is not None and now - last >= interval
+
   # Data collection functions
+    def _update_states(self, data):
+        """Store fetched data, unless the API reported it as unchanged, and notify listeners of changes.
+
+        Validators of conditional responses are committed only once the data
+        has been stored, so data that failed to store is parsed again.
+        """
+        if data.get('unchanged', False):
+            return
+        validators = data.pop('validators', None)
+        changed = set()
+        for key, value in data.items():
+            old = self._states.get(key, None)
+            if old == value:
+                continue
+            self._states[key] = value
+            changed.update(self._changed_attributes(key, old, value))
+        if validators is not None:
+            self._connection.commit_validators(validators)
+        if changed:
+            self._generation += 1
+            self._notify(changed)
+
+    def _changed_attributes(self, key, old, new):
+        """Return vehicle attributes affected by a change of states key."""
+        if isinstance(new, FieldTable):
+            changed = new.changed(old if isinstance(old, FieldTable) else EMPTY_FIELDS)
+            for attr, fields in COMBINED_FIELDS.items():
+                if not changed.isdisjoint(fields):
+                    changed.add(attr)
+            return changed
+        return STATE_ATTRIBUTES.get(key, (key,))
+
+    def _notify(self, changed):
+        """Call listeners with the changed attributes."""
+        changed = frozenset(changed)
+        _LOGGER.debug(f'Vehicle {self.vin} changed: {", ".join(sorted(changed))}')
+        for callback in list(self._listeners):
+            try:
+                callback(self, changed)
+            except Exception as error:
+                _LOGGER.warning(f'Vehicle listener {callback} failed, error: {error}')
+
+    def add_listener(self, callback):
+        """Call callback(vehicle, changed) after each update that changed vehicle data.
+
+        changed is a frozenset with the names of the vehicle attributes that
+        may have a new value. Returns a function removing the listener.
+        """
+        self._listeners.append(callback)
+        return lambda: self.remove_listener(callback)
+
+    def remove_listener(self, callback):
+        """Stop calling callback on changes."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _record_history(self, vehicle, changed):
+        """Record new values of history attributes."""
+        values = {}
+        for attr in HISTORY_ATTRIBUTES:
+            if attr not in changed:
+                continue
+            try:
+                if getattr(self, f'is_{attr}_supported'):
+                    values[attr] = getattr(self, attr)
+            except Exception as error:
+                _LOGGER.debug(f'Could not read {attr} for history, error: {error}')
+        if values:
+            self._connection.history.record(self.vin, datetime.now(timezone.utc), values)
+
+    async def history(self, attr, since=None, until=None):
+        """Return list of (timestamp, value) of attr recorded from since until until, oldest first.
+
+        Values are recorded when an update changed them, a value holds until
+        the next one. Empty when the connection keeps no history.
+        """
+        if self._connection.history is None:
+            return []
+        return await self._connection.history.query(self.vin, attr, since, until)
+
+    @property
+    def generation(self):
+        """Return a counter increased every time vehicle data changes."""
+        return self._generation
+
     async def get_realcardata(self):
         """Fetch realcar data."""
         data = await self._connection.getRealCarData(self.vin)
         if data:
-            self._states.update(data)
+            self._update_states(data)
 
     async def get_carportdata(self):
         """Fetch carport data."""
         data = await self._connection.getCarportData(self.vin)
         if data:
-            self._states.update(data)
+            self._update_states(data)
 
     async def get_preheater(self):
         """Fetch pre-heater data if function is enabled."""
         if self._services.get('rheating_v1', {}).get('active', False):
-            if not await self.expired('rheating_v1'):
+            if not await self.expired('rheating_v1') and self._poll_allowed('rs'):
                 data = await self._connection.getPreHeater(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch preheater data')
         else:
@@ -145,10 +325,10 @@ class Vehicle:
     async def get_climater(self):
         """Fetch climater data if function is enabled."""
         if self._services.get('rclima_v1', {}).get('active', False):
-            if not await self.expired('rclima_v1'):
+            if not await self.expired('rclima_v1') and self._poll_allowed('climatisation'):
                 data = await self._connection.getClimater(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch climater data')
         else:
@@ -157,17 +337,45 @@ class Vehicle:
     async def get_trip_statistic(self):
         """Fetch trip data if function is enabled."""
         if self._services.get('trip_statistic_v1', {}).get('active', False):
-            if not await self.expired('trip_statistic_v1'):
+            if not await self.expired('trip_statistic_v1') and self._poll_allowed('tripstatistics'):
                 data = await self._connection.getTripStatistics(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch trip statistics')
 
+    async def trip_statistics(self, kind='shortTerm', after=None):
+        """Yield entries of the shortTerm, longTerm or cyclic trip history one at a time.
+
+        Entries come in the order the API sends them. Pass the highest tripID
+        seen as after to only get trips with a higher one.
+        """
+        if not self._services.get('trip_statistic_v1', {}).get('active', False):
+            _LOGGER.info('Trip statistics are not supported.')
+            return
+        async for entry in self._connection.streamTripStatistics(self.vin, kind, after):
+            yield entry
+
+    async def load_trips(self, kind='shortTerm'):
+        """Load the trip history of kind into columns for trip analytics, returns the number of new trips.
+
+        Only trips after the last one loaded are fetched when called again.
+        """
+        trips = self._trips.setdefault(kind, TripColumns())
+        count = await trips.extend_stream(self.trip_statistics(kind, trips.last_trip_id))
+        if count and kind == 'shortTerm':
+            self._generation += 1
+            self._notify(TRIP_AGGREGATES)
+        return count
+
+    def trip_history(self, kind='shortTerm'):
+        """Return TripColumns of the loaded trip history of kind, None if not loaded."""
+        return self._trips.get(kind, None)
+
     async def get_position(self):
         """Fetch position data if function is enabled."""
         if self._services.get('carfinder_v1', {}).get('active', False):
-            if not await self.expired('carfinder_v1'):
+            if not await self.expired('carfinder_v1') and self._poll_allowed('cf'):
                 data = await self._connection.getPosition(self.vin)
                 if data:
                     # Reset requests remaining to 15 if parking time has been updated
@@ -178,29 +386,31 @@ class Vehicle:
                             if newTime > oldTime:
                                 _LOGGER.debug('Detected new parking time')
                                 self.requests_remaining = 15
+                                self._connection.rate_limiter.reset(self.vin)
+                                self._parked = True
                         except:
                             pass
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch any positional data')
 
     async def get_statusreport(self):
         """Fetch status data if function is enabled."""
         if self._services.get('statusreport_v1', {}).get('active', False):
-            if not await self.expired('statusreport_v1'):
+            if not await self.expired('statusreport_v1') and self._poll_allowed('vsr'):
                 data = await self._connection.getVehicleStatusData(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch status report')
 
     async def get_charger(self):
         """Fetch charger data if function is enabled."""
         if self._services.get('rbatterycharge_v1', {}).get('active', False):
-            if not await self.expired('rbatterycharge_v1'):
+            if not await self.expired('rbatterycharge_v1') and self._poll_allowed('batterycharge'):
                 data = await self._connection.getCharger(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch charger data')
         else:
@@ -209,34 +419,34 @@ class Vehicle:
     async def get_timerprogramming(self):
         """Fetch timer data if function is enabled."""
         if self._services.get('timerprogramming_v1', {}).get('active', False):
-            if not await self.expired('timerprogramming_v1'):
+            if not await self.expired('timerprogramming_v1') and self._poll_allowed('departuretimer'):
                 data = await self._connection.getTimers(self.vin)
                 if data:
-                    self._states.update(data)
+                    self._update_states(data)
                 else:
                     _LOGGER.debug('Could not fetch timers')
         else:
             self._requests.pop('departuretimer', None)
 
-    async def wait_for_request(self, section, request, retryCount=36):
-        """Update status of outstanding requests."""
-        retryCount -= 1
-        if (retryCount == 0):
-            _LOGGER.info(f'Timeout while waiting for result of {requestId}.')
-            return 'Timeout'
+    async def wait_for_request(self, section, request, timeout=REQUEST_TIMEOUT):
+        """Update status of outstanding requests.
+
+        The status is polled by the connection wide request poller, together
+        with all other outstanding requests, without blocking the event loop.
+        The wait can be cancelled by cancelling the calling task.
+        """
+        self._requests['state'] = 'In progress'
         try:
-            status = await self._connection.get_request_status(self.vin, section, request)
-            _LOGGER.debug(f'Request ID {request}: {status}')
-            if status == 'In progress':
-                self._requests['state'] = 'In progress'
-                time.sleep(5)
-                return await self.wait_for_request(section, request)
-            else:
-                self._requests['state'] = status
-                return status
+            status = await self._connection.wait_for_request(self.vin, section, request, timeout)
         except Exception as error:
             _LOGGER.warning(f'Exception encountered while waiting for request status: {error}')
-            return 'Exception'
+            status = 'Exception'
+        _LOGGER.debug(f'Request ID {request}: {status}')
+        self._requests['state'] = status
+        # Fetch the data changed by the request on the next update
+        for name in REQUEST_POLLS.get(section, ()):
+            self._polled.pop(name, None)
+        return status
 
   # Data set functions
    # Charging (BATTERYCHARGE)
@@ -531,12 +741,21 @@ class Vehicle:
     def attrs(self):
         return self._states
 
+    @property
+    def _fields(self):
+        """Return the field table of the last status report."""
+        return self._states.get('StoredVehicleData', EMPTY_FIELDS)
+
     def has_attr(self, attr):
         return is_valid_path(self.attrs, attr)
 
     def get_attr(self, attr):
         return find_path(self.attrs, attr)
 
+    def _poll_allowed(self, endpoint):
+        """Check if the request budget allows a background poll of endpoint."""
+        return self._connection.rate_limiter.allow(self.vin, endpoint)
+
     async def expired(self, service):
         """Check if access to service has expired."""
         try:
@@ -552,6 +771,7 @@ class Vehicle:
             if now >= expiration:
                 _LOGGER.warning(f'Access to {service} has expired!')
                 self._discovered = False
+                await self._connection.invalidate_cache(self.vin, 'operationList')
                 return True
             else:
                 return False
@@ -627,123 +847,20 @@ class Vehicle:
         if self.attrs.get('imageUrl', False):
             return True
 
-  # Lights
-    @property
-    def parking_light(self):
-        """Return true if parking light is on"""
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301010001'].get('value',0))
-        if response != 2:
-            return True
-        else:
-            return False
-
-    @property
-    def is_parking_light_supported(self):
-        """Return true if parking light is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301010001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
   # Connection status
     @property
     def last_connected(self):
         """Return when vehicle was last connected to connect servers."""
-        last_connected_utc = self.attrs.get('StoredVehicleDataResponse').get('vehicleData').get('data')[0].get('field')[0].get('tsCarSentUtc')
+        last_connected_utc = self._fields.last_connected
         last_connected = last_connected_utc.replace(tzinfo=timezone.utc).astimezone(tz=None)
         return last_connected.strftime('%Y-%m-%d %H:%M:%S')
 
     @property
     def is_last_connected_supported(self):
         """Return when vehicle was last connected to connect servers."""
-        if next(iter(next(iter(self.attrs.get('StoredVehicleDataResponse', {}).get('vehicleData', {}).get('data', {})), None).get('field', {})), None).get('tsCarSentUtc', []):
+        if self._fields.last_connected:
             return True
 
-  # Service information
-    @property
-    def distance(self):
-        """Return vehicle odometer."""
-        value = self.attrs.get('StoredVehicleDataResponseParsed')['0x0101010002'].get('value',0)
-        if value:
-            return int(value)
-
-    @property
-    def is_distance_supported(self):
-        """Return true if odometer is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0101010002' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def service_inspection(self):
-        """Return time left for service inspection"""
-        return - int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0203010004'].get('value'))
-
-    @property
-    def is_service_inspection_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0203010004' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def service_inspection_distance(self):
-        """Return time left for service inspection"""
-        return - int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0203010003'].get('value', 0))
-
-    @property
-    def is_service_inspection_distance_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0203010003' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def oil_inspection(self):
-        """Return time left for service inspection"""
-        return - int(self.attrs.get('StoredVehicleDataResponseParsed', {}).get('0x0203010002', {}).get('value', 0))
-
-    @property
-    def is_oil_inspection_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0203010002' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if self.attrs.get('StoredVehicleDataResponseParsed').get('0x0203010002').get('value', None) is not None:
-                    return True
-        return False
-
-    @property
-    def oil_inspection_distance(self):
-        """Return time left for service inspection"""
-        return - int(self.attrs.get('StoredVehicleDataResponseParsed', {}).get('0x0203010001',{}).get('value', 0))
-
-    @property
-    def is_oil_inspection_distance_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0203010001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if self.attrs.get('StoredVehicleDataResponseParsed').get('0x0203010001').get('value', None) is not None:
-                    return True
-        return False
-
-    @property
-    def adblue_level(self):
-        """Return adblue level."""
-        return int(self.attrs.get('StoredVehicleDataResponseParsed', {}).get('0x02040C0001', {}).get('value', 0))
-
-    @property
-    def is_adblue_level_supported(self):
-        """Return true if adblue level is supported."""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x02040C0001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x02040C0001']:
-                    if self.attrs.get('StoredVehicleDataResponseParsed')['0x02040C0001'].get('value', 0) is not None:
-                        return True
-        return False
-
   # Charger related states for EV and PHEV
     @property
     def charging(self):
@@ -947,68 +1064,6 @@ class Vehicle:
         if 'parkingTimeUTC' in self.attrs.get('findCarResponse', {}):
             return True
 
-  # Vehicle fuel level and range
-    @property
-    def electric_range(self):
-        value = -1
-        if '0x0301030008' in self.attrs.get('StoredVehicleDataResponseParsed'):
-            if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030008']:
-                value = self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030008'].get('value', 0)
-        return int(value)
-
-    @property
-    def is_electric_range_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301030008' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030008']:
-                    return True
-        return False
-
-    @property
-    def combustion_range(self):
-        value = -1
-        if '0x0301030006' in self.attrs.get('StoredVehicleDataResponseParsed'):
-            if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030006']:
-                value = self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030006'].get('value', 0)
-        return int(value)
-
-    @property
-    def is_combustion_range_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301030006' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-        return False
-
-    @property
-    def combined_range(self):
-        value = -1
-        if '0x0301030005' in self.attrs.get('StoredVehicleDataResponseParsed'):
-            if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030005']:
-                value = self.attrs.get('StoredVehicleDataResponseParsed')['0x0301030005'].get('value', 0)
-        return int(value)
-
-    @property
-    def is_combined_range_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301030005' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-        return False
-
-    @property
-    def fuel_level(self):
-        value = -1
-        if '0x030103000A' in self.attrs.get('StoredVehicleDataResponseParsed'):
-            if 'value' in self.attrs.get('StoredVehicleDataResponseParsed')['0x030103000A']:
-                value = self.attrs.get('StoredVehicleDataResponseParsed')['0x030103000A'].get('value', 0)
-        return int(value)
-
-    @property
-    def is_fuel_level_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x030103000A' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-        return False
-
   # Climatisation settings
     @property
     def climatisation_target_temperature(self):
@@ -1044,27 +1099,6 @@ class Vehicle:
             else:
                 return False
 
-    @property
-    def outside_temperature(self):
-        """Return outside temperature."""
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301020001'].get('value',0))
-        if response:
-            return round(float((response/10)-273.15), 1)
-        else:
-            return False
-
-    @property
-    def is_outside_temperature_supported(self):
-        """Return true if outside temp is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301020001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if "value" in self.attrs.get('StoredVehicleDataResponseParsed')['0x0301020001']:
-                    return True
-                else:
-                    return False
-            else:
-                return False
-
   # Climatisation, electric
     @property
     def electric_climatisation(self):
@@ -1181,7 +1215,7 @@ class Vehicle:
         if self.attrs.get('heating', {}).get('climatisationStateReport', {}).get('climatisationState', False):
             return True
 
-  # Windows
+  # Status report fields, properties for the catalogue in fields.py are added below the class
     @property
     def windows_closed(self):
         return (self.window_closed_left_front and self.window_closed_left_back and self.window_closed_right_front and self.window_closed_right_back)
@@ -1189,252 +1223,15 @@ class Vehicle:
     @property
     def is_windows_closed_supported(self):
         """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301050001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def window_closed_left_front(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301050001'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_window_closed_left_front_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301050001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def window_closed_right_front(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301050005'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_window_closed_right_front_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301050005' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def window_closed_left_back(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301050003'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_window_closed_left_back_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301050003' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def window_closed_right_back(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301050007'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
+        return self.is_window_closed_left_front_supported
 
-    @property
-    def is_window_closed_right_back_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301050007' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def sunroof_closed(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030105000B'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_sunroof_closed_supported(self):
-        """Return true if sunroof state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x030105000B' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                if (int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030105000B'].get('value',0)) == 0):
-                    return False
-                else:
-                    return True
-            else:
-                return False
-
-  # Locks
     @property
     def door_locked(self):
-        #LEFT FRONT
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040001'].get('value',0))
-        if response != 2:
-            return False
-        #LEFT REAR
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040004'].get('value',0))
-        if response != 2:
-            return False
-        #RIGHT FRONT
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040007'].get('value',0))
-        if response != 2:
-            return False
-        #RIGHT REAR
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030104000A'].get('value',0))
-        if response != 2:
-            return False
-
-        return True
+        return (self.door_locked_left_front and self.door_locked_left_back and self.door_locked_right_front and self.door_locked_right_back)
 
     @property
     def is_door_locked_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301040001' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def trunk_locked(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030104000D'].get('value',0))
-        if response == 2:
-            return True
-        else:
-            return False
-
-    @property
-    def is_trunk_locked_supported(self):
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x030104000D' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-  # Doors, hood and trunk
-    @property
-    def hood_closed(self):
-        """Return true if hood is closed"""
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040011'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_hood_closed_supported(self):
-        """Return true if hood state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301040011' in self.attrs.get('StoredVehicleDataResponseParsed', {}):
-                if (int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040011'].get('value',0)) == 0):
-                    return False
-                else:
-                    return True
-            else:
-                return False
-
-    @property
-    def door_closed_left_front(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040002'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_door_closed_left_front_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301040002' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def door_closed_right_front(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040008'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_door_closed_right_front_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301040008' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def door_closed_left_back(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x0301040005'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_door_closed_left_back_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x0301040005' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def door_closed_right_back(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030104000B'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_door_closed_right_back_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x030104000B' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
-
-    @property
-    def trunk_closed(self):
-        response = int(self.attrs.get('StoredVehicleDataResponseParsed')['0x030104000E'].get('value',0))
-        if response == 3:
-            return True
-        else:
-            return False
-
-    @property
-    def is_trunk_closed_supported(self):
-        """Return true if window state is supported"""
-        if self.attrs.get('StoredVehicleDataResponseParsed', False):
-            if '0x030104000E' in self.attrs.get('StoredVehicleDataResponseParsed'):
-                return True
-            else:
-                return False
+        return self.is_door_locked_left_front_supported
 
   # Departure timers
    # Not yet implemented
@@ -1558,7 +1355,66 @@ class Vehicle:
         if response and type(response.get('totalElectricConsumption', None)) in (float, int):
             return True
 
+    # Aggregates of the loaded shortTerm trip history, see load_trips
+    @property
+    def _trip_columns(self):
+        trips = self._trips.get('shortTerm', None)
+        return trips if trips else None
+
+    @property
+    def trip_total_distance(self):
+        return round(self._trip_columns.total('distance'), 1)
+
+    @property
+    def is_trip_total_distance_supported(self):
+        return self._trip_columns is not None
+
+    @property
+    def trip_total_duration(self):
+        return round(self._trip_columns.total('duration'))
+
+    @property
+    def is_trip_total_duration_supported(self):
+        return self._trip_columns is not None
+
+    @property
+    def trip_average_speed(self):
+        duration = self._trip_columns.total('duration')
+        return round(self._trip_columns.total('distance') * 60 / duration, 1) if duration else None
+
+    @property
+    def is_trip_average_speed_supported(self):
+        return self._trip_columns is not None and self._trip_columns.total('duration') > 0
+
+    @property
+    def trip_average_fuel_consumption(self):
+        value = self._trip_columns.weighted_average('fuel')
+        return round(value, 1) if value is not None else None
+
+    @property
+    def is_trip_average_fuel_consumption_supported(self):
+        return self._trip_columns is not None and self._trip_columns.weighted_average('fuel') is not None
+
+    @property
+    def trip_average_electric_consumption(self):
+        value = self._trip_columns.weighted_average('electric')
+        return round(value, 1) if value is not None else None
+
+    @property
+    def is_trip_average_electric_consumption_supported(self):
+        return self._trip_columns is not None and self._trip_columns.weighted_average('electric') is not None
+
+    @property
+    def trip_recuperation_share(self):
+        value = self._trip_columns.recuperation_share()
+        return round(value * 100, 1) if value is not None else None
+
+    @property
+    def is_trip_recuperation_share_supported(self):
+        return self._trip_columns is not None and self._trip_columns.recuperation_share() is not None
+
   # Status of set data requests
+
     @property
     def refresh_action_status(self):
         """Return latest status of data refresh request."""
@@ -1653,8 +1509,34 @@ class Vehicle:
         def serialize(obj):
             if isinstance(obj, datetime):
                 return obj.isoformat()
+            if isinstance(obj, FieldTable):
+                return obj.as_dict()
         return to_json(
             OrderedDict(sorted(self.attrs.items())),
             indent=4,
             default=serialize
         )
+
+
+def _status_property(field):
+    """Return value and is_supported properties for a catalogue field."""
+    attr = field.attr
+    default = field.default
+
+    def value(self):
+        return self._fields.value(attr, default)
+
+    def supported(self):
+        return self._fields.supports(attr)
+
+    value.__doc__ = f'Return {(field.name or attr).lower()}.'
+    supported.__doc__ = f'Return true if {(field.name or attr).lower()} is supported.'
+    return property(value), property(supported)
+
+
+for _field in STATUS_FIELDS:
+    _value, _supported = _status_property(_field)
+    setattr(Vehicle, _field.attr, _value)
+    setattr(Vehicle, f'is_{_field.attr}_supported', _supported)
+
+del _field, _value, _supported
@@ -0,0 +1,50 @@
+"""Tests for dropping cached responses."""
+import asyncio
+
+from skodaconnect.cache import MemoryCache
+from skodaconnect.connection import Connection
+
+VIN = 'TMBJJ7NE0L0000000'
+OTHER = 'TMBJJ7NE0L0000001'
+KEYS = ('user::realCarData', f'user:{VIN}:homeRegion', f'user:{VIN}:operationList', f'user:{OTHER}:homeRegion')
+
+
+def cached_connection():
+    """Return a Connection with cached responses of two vehicles and the account."""
+    cache = MemoryCache()
+    connection = Connection(None, 'user', 'password', response_cache=cache)
+
+    async def fill():
+        for key in KEYS:
+            await cache.set(key, {'key': key}, 3600)
+
+    asyncio.run(fill())
+    return connection, cache
+
+
+def cached_keys(cache):
+    """Return the keys still cached."""
+    async def get():
+        return [key for key in KEYS if await cache.get(key) is not None]
+
+    return set(asyncio.run(get()))
+
+
+def test_invalidate_vehicle_drops_account_responses():
+    connection, cache = cached_connection()
+    asyncio.run(connection.invalidate_cache(VIN))
+    assert cached_keys(cache) == {f'user:{OTHER}:homeRegion'}
+
+
+def test_invalidate_kind():
+    connection, cache = cached_connection()
+    asyncio.run(connection.invalidate_cache(VIN, 'operationList'))
+    assert cached_keys(cache) == {'user::realCarData', f'user:{VIN}:homeRegion', f'user:{OTHER}:homeRegion'}
+    asyncio.run(connection.invalidate_cache(VIN, 'realCarData'))
+    assert cached_keys(cache) == {f'user:{VIN}:homeRegion', f'user:{OTHER}:homeRegion'}
+
+
+def test_invalidate_account():
+    connection, cache = cached_connection()
+    asyncio.run(connection.invalidate_cache())
+    assert cached_keys(cache) == set()
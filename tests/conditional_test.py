@@ -0,0 +1,84 @@
+"""Tests for conditional requests skipping unchanged vehicle data."""
+import asyncio
+import json
+
+from skodaconnect.connection import Connection
+from skodaconnect.vehicle import Vehicle
+
+VIN = 'TMBJJ7NE0L0000000'
+BODY = json.dumps({
+    'StoredVehicleDataResponse': {
+        'vehicleData': {'data': [{'field': [{'id': '0x0101010002', 'value': '1234', 'tsCarSentUtc': '2021-03-01T12:00:00Z'}]}]}
+    }
+}).encode()
+
+
+class _Response:
+    status = 200
+    headers = {}
+    cookies = {}
+
+    async def read(self):
+        return BODY
+
+    def raise_for_status(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class _Session:
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, method, url, **kwargs):
+        self.requests += 1
+        return _Response()
+
+
+def test_unchanged_response_is_skipped():
+    connection = Connection(None, 'user', 'password')
+    connection._session = _Session()
+    vehicle = Vehicle(connection, VIN)
+    vehicle._services['statusreport_v1'] = {'active': True}
+
+    async def run():
+        await vehicle.get_statusreport()
+        assert await connection.getVehicleStatusData(VIN) == {'unchanged': True}
+
+    asyncio.run(run())
+    assert vehicle.distance == 1234
+    assert vehicle.generation == 1
+
+
+def test_response_failing_to_store_is_parsed_again():
+    connection = Connection(None, 'user', 'password')
+    connection._session = _Session()
+    vehicle = Vehicle(connection, VIN)
+    vehicle._services['statusreport_v1'] = {'active': True}
+    changed_attributes = vehicle._changed_attributes
+    failures = [KeyError('field')]
+
+    def fail_once(key, old, new):
+        if failures:
+            raise failures.pop()
+        return changed_attributes(key, old, new)
+
+    vehicle._changed_attributes = fail_once
+
+    async def run():
+        try:
+            await vehicle.get_statusreport()
+        except KeyError:
+            pass
+        vehicle._states.clear()
+        await vehicle.get_statusreport()
+
+    asyncio.run(run())
+    assert connection._session.requests == 2
+    assert vehicle.distance == 1234
+    assert vehicle.generation == 1
@@ -0,0 +1,49 @@
+"""Tests for the instruments of the dashboard."""
+from skodaconnect.dashboard import Dashboard, create_instruments
+from skodaconnect.vehicle import TRIP_AGGREGATES
+
+# Order of the instruments before status report fields came from the catalogue
+PREVIOUS_ORDER = [
+    'position', 'door_locked', 'trunk_locked', 'refresh_data', 'window_heater', 'climatisation_without_external_power',
+    'electric_climatisation', 'auxiliary_climatisation', 'pheater_ventilation', 'pheater_heating', 'charging',
+    'request_results', 'distance', 'battery_level', 'adblue_level', 'fuel_level', 'service_inspection',
+    'service_inspection_distance', 'oil_inspection', 'oil_inspection_distance', 'last_connected', 'parking_time',
+    'charging_time_left', 'electric_range', 'combustion_range', 'combined_range', 'charge_max_ampere',
+    'climatisation_target_temperature', 'trip_last_average_speed', 'trip_last_average_electric_consumption',
+    'trip_last_average_fuel_consumption', 'trip_last_duration', 'trip_last_length', 'trip_last_recuperation',
+    'trip_last_average_auxillary_consumption', 'trip_last_total_electric_consumption', 'pheater_status',
+    'pheater_duration', 'outside_temperature', 'requests_remaining', 'external_power', 'energy_flow', 'parking_light',
+    'door_locked', 'door_closed_left_front', 'door_closed_right_front', 'door_closed_left_back',
+    'door_closed_right_back', 'trunk_locked', 'trunk_closed', 'hood_closed', 'charging_cable_connected',
+    'charging_cable_locked', 'sunroof_closed', 'windows_closed', 'window_closed_left_front', 'window_closed_left_back',
+    'window_closed_right_front', 'window_closed_right_back', 'vehicle_moving', 'request_in_progress',
+]
+
+
+def test_catalogue_instruments_keep_their_place():
+    attrs = [instrument.attr for instrument in create_instruments() if instrument.attr not in TRIP_AGGREGATES]
+    assert attrs == PREVIOUS_ORDER
+
+
+class _Vehicle:
+    """Vehicle whose battery level changes every time it is read."""
+    generation = 0
+    vin = 'TMBJJ7NE0L0000000'
+    is_battery_level_supported = True
+
+    def __init__(self):
+        self.reads = 0
+
+    @property
+    def battery_level(self):
+        self.reads += 1
+        return self.reads
+
+
+def test_snapshot_reads_each_state_once():
+    vehicle = _Vehicle()
+    dashboard = Dashboard(vehicle)
+    assert len(dashboard.instruments) == 1
+    vehicle.reads = 0
+    assert dashboard.snapshot() == {'sensor.battery_level': (1, '1 %')}
+    assert vehicle.reads == 1
@@ -0,0 +1,104 @@
+"""Compare the status field catalogue with the handwritten properties it replaced."""
+import pytest
+
+from skodaconnect.fields import FieldTable, STATUS_FIELDS
+from skodaconnect.vehicle import Vehicle
+
+
+def _closed(field_id, closed=3):
+    return (lambda f: f.get(field_id, 0) == closed, lambda f: field_id in f)
+
+
+def _distance(f):
+    value = f.get('0x0101010002', 0)
+    if value:
+        return value
+
+
+def _outside_temperature(f):
+    response = f.get('0x0301020001', 0)
+    if response:
+        return round(float((response/10)-273.15), 1)
+    else:
+        return False
+
+
+# Value and is_supported of each catalogue attribute, as the removed properties computed them
+PREVIOUS = {
+    'parking_light': (lambda f: f.get('0x0301010001', 0) != 2, lambda f: '0x0301010001' in f),
+    'distance': (_distance, lambda f: '0x0101010002' in f),
+    'service_inspection': (lambda f: - f.get('0x0203010004'), lambda f: '0x0203010004' in f),
+    'service_inspection_distance': (lambda f: - f.get('0x0203010003', 0), lambda f: '0x0203010003' in f),
+    'oil_inspection': (lambda f: - f.get('0x0203010002', 0), lambda f: f.get('0x0203010002') is not None),
+    'oil_inspection_distance': (lambda f: - f.get('0x0203010001', 0), lambda f: f.get('0x0203010001') is not None),
+    'adblue_level': (lambda f: f.get('0x02040C0001', 0), lambda f: f.get('0x02040C0001') is not None),
+    'electric_range': (lambda f: f.get('0x0301030008', -1), lambda f: f.get('0x0301030008') is not None),
+    'combustion_range': (lambda f: f.get('0x0301030006', -1), lambda f: '0x0301030006' in f),
+    'combined_range': (lambda f: f.get('0x0301030005', -1), lambda f: '0x0301030005' in f),
+    'fuel_level': (lambda f: f.get('0x030103000A', -1), lambda f: '0x030103000A' in f),
+    'outside_temperature': (_outside_temperature, lambda f: f.get('0x0301020001') is not None),
+    'window_closed_left_front': _closed('0x0301050001'),
+    'window_closed_left_back': _closed('0x0301050003'),
+    'window_closed_right_front': _closed('0x0301050005'),
+    'window_closed_right_back': _closed('0x0301050007'),
+    'sunroof_closed': (lambda f: f.get('0x030105000B', 0) == 3, lambda f: f.get('0x030105000B', 0) != 0),
+    'door_locked_left_front': _closed('0x0301040001', 2),
+    'door_locked_left_back': _closed('0x0301040004', 2),
+    'door_locked_right_front': _closed('0x0301040007', 2),
+    'door_locked_right_back': _closed('0x030104000A', 2),
+    'trunk_locked': _closed('0x030104000D', 2),
+    'door_closed_left_front': _closed('0x0301040002'),
+    'door_closed_left_back': _closed('0x0301040005'),
+    'door_closed_right_front': _closed('0x0301040008'),
+    'door_closed_right_back': _closed('0x030104000B'),
+    'trunk_closed': _closed('0x030104000E'),
+    'hood_closed': (lambda f: f.get('0x0301040011', 0) == 3, lambda f: f.get('0x0301040011', 0) != 0),
+}
+
+VALUES = ['0', '1', '2', '3', '4', '-5', '123', '2564', '2731', '2732', 'invalid']
+
+
+class _Connection:
+    history = None
+
+
+def _field(field_id, value):
+    field = {'id': field_id, 'tsCarSentUtc': '2021-03-01T12:00:00Z'}
+    if value is not None:
+        field['value'] = value
+    return field
+
+
+def _vehicle(fields):
+    vehicle = Vehicle(_Connection(), 'TMBJJ7NE0L0000000')
+    table = FieldTable.from_response({'vehicleData': {'data': [{'field': fields}]}})
+    vehicle._states['StoredVehicleData'] = table
+    return vehicle, table
+
+
+def _cases():
+    for field in STATUS_FIELDS:
+        values = VALUES + [str(value) for value in range(1, 4000)] if field.attr == 'outside_temperature' else VALUES
+        for value in values:
+            yield field, 'present', [_field(field.id, value)]
+        yield field, 'valueless', [_field(field.id, None)]
+        yield field, 'missing', [_field('0x0000000000', '1')]
+
+
+def test_catalogue_covers_previous_properties():
+    assert set(PREVIOUS) == set(field.attr for field in STATUS_FIELDS)
+
+
+@pytest.mark.parametrize('field', STATUS_FIELDS, ids=lambda field: field.attr)
+def test_catalogue_matches_previous_properties(field):
+    previous_value, previous_supported = PREVIOUS[field.attr]
+    for _, case, fields in (case for case in _cases() if case[0] is field):
+        vehicle, table = _vehicle(fields)
+        try:
+            expected = previous_value(table)
+        except TypeError:
+            # Negating a missing value raised, the catalogue returns its default instead
+            expected = field.default
+        value = getattr(vehicle, field.attr)
+        assert (value, type(value)) == (expected, type(expected)), (case, fields)
+        assert bool(getattr(vehicle, f'is_{field.attr}_supported')) == bool(previous_supported(table)), (case, fields)
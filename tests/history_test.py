@@ -0,0 +1,38 @@
+"""Tests for the SQLite history store."""
+import asyncio
+
+from datetime import datetime, timezone
+
+from skodaconnect.history import SQLiteHistory
+
+VIN = 'TMBJJ7NE0L0000000'
+TIME = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def test_record_and_query():
+    history = SQLiteHistory(':memory:')
+
+    async def run():
+        history.record(VIN, TIME, {'battery_level': 80, 'door_locked': True})
+        assert await history.query(VIN, 'battery_level') == [(TIME, 80)]
+        assert await history.query(VIN, 'door_locked') == [(TIME, True)]
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_flush_and_query_after_close():
+    history = SQLiteHistory(':memory:')
+
+    async def run():
+        history.record(VIN, TIME, {'battery_level': 80})
+        await history.close()
+        history.record(VIN, TIME, {'battery_level': 70})
+        await history.flush()
+        assert history._pending == []
+        assert await history.query(VIN, 'battery_level') == []
+        await history.close()
+        assert history._db is None
+        assert history._executor._shutdown
+
+    asyncio.run(run())
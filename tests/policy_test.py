@@ -0,0 +1,77 @@
+"""Tests for circuit breakers of data requests and their bypass for user actions."""
+import asyncio
+
+import pytest
+from aiohttp.client_exceptions import ClientResponseError
+
+from skodaconnect.connection import Connection
+from skodaconnect.policy import breaker_key
+
+VIN = 'TMBJJ7NE0L0000000'
+CLIMATER = f'https://msg.volkswagen.de/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/{VIN}/climater'
+ACTION = f'https://msg.volkswagen.de/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/{VIN}/climater/actions/1234'
+
+
+def failing_connection(failing):
+    """Return a Connection whose requests to URLs ending with failing raise HTTP 502, and the list of URLs requested."""
+    connection = Connection(None, 'user', 'password')
+    requested = []
+
+    async def request(method, url, token=None, headers=None, vin='', conditional=False, **kwargs):
+        requested.append(url)
+        if url.endswith(failing):
+            raise ClientResponseError(None, (), status=502)
+        return {'action': {'actionState': 'succeeded'}}
+
+    connection._request = request
+    return connection, requested
+
+
+def test_breaker_key_removes_vin_and_ids():
+    assert breaker_key(CLIMATER, VIN) == '/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/$vin/climater'
+    assert breaker_key(ACTION, VIN) == '/fs-car/bs/climatisation/v1/skoda/CZ/vehicles/$vin/climater/actions/$id'
+    assert breaker_key(ACTION.replace('1234', '5678'), VIN) == breaker_key(ACTION, VIN)
+
+
+def test_failing_data_poll_does_not_block_other_endpoints():
+    connection, requested = failing_connection('/climater')
+
+    async def run():
+        for _ in range(3):
+            await connection.get(CLIMATER, VIN)
+        requested.clear()
+        assert await connection.get(CLIMATER, VIN) == {'status_code': 502}
+        assert requested == []
+        assert 'action' in await connection.get(ACTION, VIN)
+        assert 'action' in await connection.get(CLIMATER.replace('climatisation', 'batterycharge').replace('climater', 'charger'), VIN)
+
+    connection._request_policy._attempts = 1
+    asyncio.run(run())
+
+
+def test_action_requests_bypass_breakers():
+    connection, requested = failing_connection('/actions/1234')
+    connection._request_policy._attempts = 1
+
+    async def run():
+        for _ in range(5):
+            assert await connection.get(ACTION, VIN, policy=False) == {'status_code': 502}
+        assert len(requested) == 5
+        assert connection._request_policy.allow(VIN, breaker_key(ACTION, VIN))
+
+    asyncio.run(run())
+
+
+def test_security_token_failures_do_not_block_actions():
+    connection, requested = failing_connection('security-pin-auth-requested')
+
+    async def run():
+        for _ in range(5):
+            with pytest.raises(Exception):
+                await connection.get_sec_token(VIN, '1234', 'lock')
+        assert len(requested) == 5
+        assert all(VIN in url for url in requested)
+        assert connection._request_policy.allow(VIN, breaker_key(requested[0], VIN))
+        assert connection._request_policy.allow('', breaker_key(requested[0]))
+
+    asyncio.run(run())
@@ -0,0 +1,28 @@
+"""Tests for request budgets kept per vehicle and endpoint."""
+import pytest
+
+from skodaconnect.ratelimit import RateLimitScheduler, endpoint_of
+
+VIN = 'TMBJJ7NE0L0000000'
+HOME_REGION = f'https://mal-1a.prd.ece.vwg-connect.com/api/cs/vds/v1/vehicles/{VIN}/homeRegion'
+OPERATION_LIST = f'https://mal-3a.prd.ece.vwg-connect.com/api/rolesrights/operationlist/v3/vehicles/{VIN}'
+SECURITY = 'https://mal-3a.prd.ece.vwg-connect.com/api/rolesrights/authorization/v2/security-pin-auth-requested'
+
+
+@pytest.mark.parametrize('url, endpoint', [
+    (f'https://msg.volkswagen.de/fs-car/bs/vsr/v1/skoda/CZ/vehicles/{VIN}/status', 'vsr'),
+    (HOME_REGION, 'cs/vds'),
+    (OPERATION_LIST, 'rolesrights/operationlist'),
+    (SECURITY, 'rolesrights/authorization'),
+    ('https://api.connect.skoda-auto.cz/api/v2/garage/vehicles', 'garage'),
+])
+def test_endpoint_of(url, endpoint):
+    assert endpoint_of(url) == endpoint
+
+
+def test_drained_api_endpoint_does_not_hold_back_others():
+    scheduler = RateLimitScheduler()
+    scheduler.record(VIN, HOME_REGION, 0)
+    assert not scheduler.allow(VIN, endpoint_of(HOME_REGION))
+    assert scheduler.allow(VIN, endpoint_of(OPERATION_LIST))
+    assert scheduler.allow(VIN, endpoint_of(SECURITY))
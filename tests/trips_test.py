@@ -0,0 +1,71 @@
+"""Tests for streaming trip statistics and loading them into columns."""
+import asyncio
+import json
+
+from datetime import datetime, timedelta
+
+from skodaconnect.analytics import TripColumns
+from skodaconnect.connection import Connection
+
+VIN = 'TMBJJ7NE0L0000000'
+TRIPS = [{'tripID': '12', 'mileage': 5}, {'tripID': '10', 'mileage': 7}, {'tripID': 'x', 'mileage': 1}, {'tripID': 14, 'mileage': 3}]
+
+
+class _Content:
+    def __init__(self, body):
+        self._body = body
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+
+class _Response:
+    status = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.content = _Content(body)
+
+    def raise_for_status(self):
+        pass
+
+    def release(self):
+        pass
+
+
+class _Session:
+    async def get(self, url, **kwargs):
+        return _Response(json.dumps({'tripDataList': {'tripData': TRIPS}}).encode())
+
+
+def streaming_connection():
+    connection = Connection(None, 'user', 'password')
+    connection._session = _Session()
+    expiry = datetime.now() + timedelta(days=1)
+    connection._session_token_expiry = {'identity': expiry, 'vwg': expiry}
+    return connection
+
+
+def stream(connection, after=None):
+    async def run():
+        return [trip async for trip in connection.streamTripStatistics(VIN, 'longTerm', after)]
+
+    return asyncio.run(run())
+
+
+def test_stream_keeps_api_order():
+    assert stream(streaming_connection()) == TRIPS
+
+
+def test_stream_resumes_after_numeric_trip_id():
+    connection = streaming_connection()
+    assert stream(connection, '11') == [TRIPS[0], TRIPS[3]]
+    assert stream(connection, 12) == [TRIPS[3]]
+
+
+def test_columns_keep_highest_trip_id():
+    trips = TripColumns()
+    assert trips.extend(TRIPS) == 4
+    assert trips.last_trip_id == 14
+    assert trips.total('distance') == 16